@@ -7,7 +7,9 @@ respond to data changes.
 """
 from .ref import Ref, ReadOnlyRef
 from .effect import effect
+from .batch import batch
+from .derived import derived
 from .reactive_dict import ReactiveDict
 from .view import ReadOnlyView
 
-__all__ = ["Ref", "ReadOnlyRef", "effect", "ReactiveDict", "ReadOnlyView"]
\ No newline at end of file
+__all__ = ["Ref", "ReadOnlyRef", "effect", "batch", "derived", "ReactiveDict", "ReadOnlyView"]
\ No newline at end of file
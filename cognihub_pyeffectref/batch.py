@@ -0,0 +1,73 @@
+"""批量更新的实现.
+
+在 batch() 上下文中对 Ref 的赋值只更新值并记录待通知的 Ref,退出最外层 batch 时统一通知订阅者.
+通知过程中产生的新写入会作为下一轮继续刷新,effect 在所有轮次传播完之后才运行,同一个 effect 在一次刷新中只运行一次.
+
+用法:
+    from cognihub_pyeffectref import batch, Ref
+    a = Ref(1)
+    b = Ref(2)
+    with batch():
+        a.value = 10
+        b.value = 20
+    # 同时依赖 a 和 b 的 effect 只会在这里被触发一次
+"""
+import cognihub_pyeffectref.local as local
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+# 一次刷新最多处理的轮数,超过时认为 effect 之间存在循环写入
+_MAX_FLUSH_ROUNDS = 100
+
+
+@contextmanager
+def batch() -> Iterator[None]:
+    """批量更新上下文,退出时统一通知期间发生变化的 Ref 的订阅者.
+
+    可以嵌套使用,只有最外层的 batch 退出时才会刷新.
+    即使上下文中抛出异常,已经写入的值也会正常通知.
+    """
+    if local._batch_pending.get() is not None:
+        # 嵌套的 batch 由最外层统一刷新
+        yield
+        return
+
+    token = local._batch_pending.set({})
+    try:
+        yield
+    finally:
+        try:
+            _flush_pending()
+        finally:
+            local._batch_pending.reset(token)
+
+
+def _flush_pending() -> None:
+    """逐轮通知待处理的 Ref,直到没有新的写入.
+
+    调用方需保证当前上下文中 _batch_pending 不为 None.
+    每轮开始时换上新的待处理字典,订阅者在通知中产生的写入会被收集到下一轮.
+    普通回调和派生值在传播中立即执行;普通 effect 先登记,等所有轮次传播完、派生值稳定后每个只运行一次,
+    这样同时读取源值和派生值的 effect 不会看到中间状态,也不会重复运行.
+    effect 运行中产生的写入会开始新一次传播.
+    """
+    rounds = 0
+    while True:
+        queued_effects: dict[Any, tuple[Any, Any, Any]] = {}
+        pending = local._batch_pending.get()
+        while pending:
+            rounds += 1
+            if rounds > _MAX_FLUSH_ROUNDS:
+                local._batch_pending.set({})
+                print(f"[ERROR] Batch flush exceeded {_MAX_FLUSH_ROUNDS} rounds, possible circular updates between effects. Remaining notifications dropped.")
+                return
+            local._batch_pending.set({})
+            # 同一轮中被多个 Ref 触发的派生值只重新计算一次
+            notified_effects: set[Any] = set()
+            for ref, old_value in pending.items():
+                ref._notify_subscribers(old_value, ref._value, notified_effects, queued_effects)
+            pending = local._batch_pending.get()
+        if not queued_effects:
+            return
+        for effect, (ref, new_value, old_value) in queued_effects.items():
+            ref._run_queued_effect(effect, new_value, old_value)
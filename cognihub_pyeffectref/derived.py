@@ -0,0 +1,61 @@
+"""派生值的实现.
+
+derived() 用一个无参函数计算出一个只读的响应式值,函数中读取的 Ref 变化时自动重新计算.
+重新计算的结果与上次相等时不会通知订阅者,依赖派生值的 effect 只在结果真正改变时才重新执行.
+
+用法:
+    from cognihub_pyeffectref import derived, effect, Ref
+    price = Ref(100)
+    quantity = Ref(2)
+    subtotal = derived(lambda: price.value * quantity.value)
+
+    @effect
+    def show_total() -> None:
+        print(subtotal.value)
+"""
+import asyncio
+from .ref import Ref, ReadOnlyRef
+from .effect import EffectWrapper
+from typing import Callable, List, TypeVar
+
+T = TypeVar('T')
+
+
+class _DerivedEffect(EffectWrapper):
+    """派生值的内部 effect.
+
+    在传播中立即重新计算,使普通 effect 在刷新末尾运行时读到的派生值已经是最新的.
+    """
+    __slots__ = ()
+    _eager = True
+
+
+def derived(func: Callable[[], T]) -> ReadOnlyRef[T]:
+    """创建一个派生值,返回包装计算结果的 ReadOnlyRef.
+
+    func 会立即执行一次以收集依赖,之后在任一依赖变化时重新执行,并把结果写入内部的 Ref.
+    派生值可以被 effect 读取,也可以作为其他派生值的依赖.
+
+    参数:
+        func: 计算派生值的同步无参函数.
+
+    Raises:
+        TypeError: 如果 func 是协程函数.
+    """
+    if asyncio.iscoroutinefunction(func):
+        raise TypeError("derived() does not support coroutine functions.")
+
+    # 第一次计算时创建 Ref,之后的计算通过 Ref 的 setter 写入,相等的结果不会通知
+    holder: List[Ref[T]] = []
+
+    def compute() -> None:
+        value = func()
+        if holder:
+            holder[0].value = value
+        else:
+            holder.append(Ref(value))
+
+    compute.__name__ = getattr(func, '__name__', 'derived')
+    # 内部的 effect 由依赖的 Ref 持有,派生值的生命周期与其依赖一致
+    _DerivedEffect(compute, False)()
+    return ReadOnlyRef(holder[0])
@@ -12,14 +12,26 @@
         return a.value + b.value + c
 """
 import asyncio
+import weakref
 import cognihub_pyeffectref.local as local
-from typing import Callable, Any
+from typing import Callable, Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .ref import Ref
 
 
 class EffectWrapper:
     """
     封装 effect 函数,提供 __call__ 使其可调用,并管理其 stop 行为.
     """
+    __slots__ = (
+        '_func', '__name__', '_is_async', '_is_active',
+        '_last_args', '_last_kwargs', '_has_been_called_at_least_once',
+        '_call_impl', '_trigger_impl', '_deps', '__weakref__',
+    )
+
+    # 批量刷新时普通 effect 等传播稳定后才运行;为 True 的 effect (如派生值的内部计算) 在传播中立即运行
+    _eager = False
 
     def __init__(self, func: Callable[..., Any], is_async: bool):
         self._func = func
@@ -29,70 +41,93 @@ class EffectWrapper:
         self._last_args: tuple[Any, ...] = ()  # 保存上次调用时的位置参数
         self._last_kwargs: dict[str, Any] = {} # 保存上次调用时的关键字参数
         self._has_been_called_at_least_once = False # 标记是否至少被手动调用过一次
+        # 此 effect 依赖(已订阅)的 Ref,由 Ref 在收集依赖时登记;使用弱引用,不延长 Ref 的生命周期
+        self._deps: 'weakref.WeakSet[Ref[Any]]' = weakref.WeakSet()
+        # 同步/异步分派在构造时确定一次,stop() 时整体替换为不执行的实现,
+        # 这样调用和触发的热路径上不再需要判断 _is_active 和 _is_async
+        self._call_impl: Callable[..., Any] = self._call_async if is_async else self._call_sync
+        self._trigger_impl: Callable[[], Any] = self._run_triggered_async if is_async else self._run_triggered_sync
 
 
     # 这是effect实例被直接调用时(例如 my_effect(arg1, arg2))的入口
     def __call__(self, *args: Any, **kwargs: Any) -> Any:
-        if not self._is_active:
-            print(f"Warning: Calling inactive effect '{self.name}'.")
-            return
+        return self._call_impl(*args, **kwargs)
 
+    def _call_sync(self, *args: Any, **kwargs: Any) -> Any:
         # 核心修改: 保存这次调用传入的参数
         self._last_args = args
         self._last_kwargs = kwargs
         self._has_been_called_at_least_once = True
-        # 在__call__中进行依赖收集的上下文设置
-        if self._is_async:
-            return self._run_async_context(*args, **kwargs)
-        else:
-            return self._run_sync_context(*args, **kwargs)
-
-    def _run_sync_context(self, *args: Any, **kwargs: Any) -> Any:
-        old_effect = getattr(local._thread_local_current_effect, 'value', None)
-        local._thread_local_current_effect.value = self # 设置线程局部变量为自身实例
-
+        # 在调用中进行依赖收集的上下文设置
+        token = local._current_effect.set(self) # 设置 contextvar 为自身实例
+        local._enter_effect()
         try:
             return self._func(*args, **kwargs) # 传递所有传入__call__的参数
         finally:
-            local._thread_local_current_effect.value = old_effect
+            local._exit_effect()
+            local._current_effect.reset(token)
+
+    def _call_async(self, *args: Any, **kwargs: Any) -> Any:
+        # 参数在调用时立即保存,而不是等到协程被 await 时
+        self._last_args = args
+        self._last_kwargs = kwargs
+        self._has_been_called_at_least_once = True
+        return self._run_async_context(*args, **kwargs)
+
+    def _call_inactive(self, *args: Any, **kwargs: Any) -> None:
+        print(f"Warning: Calling inactive effect '{self.name}'.")
 
     async def _run_async_context(self, *args: Any, **kwargs: Any) -> Any:
-        token = local._async_local_current_effect.set(self) # 设置 contextvar 为自身实例
+        token = local._current_effect.set(self) # 设置 contextvar 为自身实例
+        local._enter_effect()
         try:
             return await self._func(*args, **kwargs) # 传递所有传入__call__的参数
         finally:
-            local._async_local_current_effect.reset(token)
+            local._exit_effect()
+            local._current_effect.reset(token)
 
     def run_triggered_effect(self, new_value: Any, old_value: Any) -> Any: # 接收 new_value, old_value 但通常不直接传递给 _func
-        if not self._is_active:
-            return
-        
+        return self._trigger_impl()
+
+    def _check_called(self) -> bool:
         # 只有在至少被手动调用过一次并保存了参数后,Ref 触发时才重用这些参数
         if not self._has_been_called_at_least_once:
             print(f"Warning: Effect '{self.name}' triggered by Ref change but never explicitly called with parameters. Skipping execution.")
-            return
+            return False
+        return True
 
+    def _run_triggered_sync(self) -> Any:
+        if not self._check_called():
+            return
         # 核心修正: 使用上次保存的参数来调用 _func
-        if self._is_async:
-            # 对于异步函数,返回协程对象,由调用者决定如何处理
-            return self._run_triggered_async(self._last_args, self._last_kwargs)
-        else:
-            return self._run_triggered_sync(self._last_args, self._last_kwargs)
-
-    def _run_triggered_sync(self, args_to_pass: tuple[Any, ...], kwargs_to_pass: dict[str, Any]) -> Any:
-        # 不设置上下文变量,因为依赖已收集
-        return self._func(*args_to_pass, **kwargs_to_pass)
-
-    async def _run_triggered_async(self, args_to_pass: tuple[Any, ...], kwargs_to_pass: dict[str, Any]) -> Any:
-        # 不设置上下文变量,因为依赖已收集
-        return await self._func(*args_to_pass, **kwargs_to_pass)
+        # 重新执行时同样设置上下文变量: 已有的依赖不会重复登记,
+        # 而条件分支或新增数据使本次执行第一次读取的 Ref 会被补充收集
+        token = local._current_effect.set(self)
+        local._enter_effect()
+        try:
+            return self._func(*self._last_args, **self._last_kwargs)
+        finally:
+            local._exit_effect()
+            local._current_effect.reset(token)
+
+    def _run_triggered_async(self) -> Any:
+        if not self._check_called():
+            return
+        # 对于异步函数,返回在 effect 上下文中执行 _func 的协程对象,由调用者决定如何处理
+        return self._run_async_context(*self._last_args, **self._last_kwargs)
+
+    def _trigger_inactive(self) -> None:
+        return None
+
     def stop(self) -> None:
         """停止这个 effect,使其不再响应 Ref 变化."""
         self._is_active = False
-        # 在这里,如果 Ref 内部存储的是 EffectWrapper 实例,
-        # 则可以遍历 Ref 的 _subscribers 并移除 self.
-        # 但这需要 Ref 暴露一个 API 或 EffectWrapper 持有 Ref 的引用,
-        # 为了简化,我们只设置 _is_active.
+        self._call_impl = self._call_inactive
+        self._trigger_impl = self._trigger_inactive
+        # 从所有依赖的 Ref 中取消订阅,之后这些 Ref 变化时不再需要遍历到此 effect
+        for ref in list(self._deps):
+            ref.unsubscribe(self)
+        self._deps.clear()
         print(f"Effect '{self._func.__name__}' stopped.")
     
     @property
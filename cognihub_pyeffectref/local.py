@@ -1,11 +1,33 @@
 import threading
 from contextvars import ContextVar
-from typing import Optional, TYPE_CHECKING
+from typing import Any, Dict, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .effect import EffectWrapper
+    from .ref import Ref
 
-# --- 1. 定义线程局部和上下文变量来存储当前的 effect ---
-_thread_local_current_effect = threading.local()
-_async_local_current_effect: ContextVar[Optional['EffectWrapper']] = ContextVar('async_local_current_effect', default=None)
+# --- 1. 定义上下文变量来存储当前的 effect ---
+# ContextVar 同时提供线程隔离(每个线程有独立的上下文)和 asyncio 任务隔离,同步和异步 effect 共用这一个变量
+_current_effect: ContextVar[Optional['EffectWrapper']] = ContextVar('current_effect', default=None)
 
+# 进程内正在执行(含等待中的异步 effect)的 effect 数量.
+# 为 0 时不可能有 effect 在收集依赖,Ref 的 getter 可以跳过 contextvar 查询;
+# 不为 0 时仍以 _current_effect 为准,因此这个计数只需要保证不会在 effect 执行期间为 0
+_active_effect_count = 0
+_active_effect_count_lock = threading.Lock()
+
+
+def _enter_effect() -> None:
+    global _active_effect_count
+    with _active_effect_count_lock:
+        _active_effect_count += 1
+
+
+def _exit_effect() -> None:
+    global _active_effect_count
+    with _active_effect_count_lock:
+        _active_effect_count -= 1
+
+# --- 2. 批量更新中待通知的 Ref ---
+# 值为 None 表示当前不在批量更新中;否则为 {Ref: 第一次变更前的旧值},按首次变更的顺序排列
+_batch_pending: ContextVar[Optional[Dict['Ref[Any]', Any]]] = ContextVar('batch_pending', default=None)
@@ -1,99 +1,195 @@
 """将嵌套的字典/JSON数据转换为响应式字典,支持点语法访问和字典风格访问."""
 import json
+import threading
 import collections.abc
-from cognihub_pyeffectref.ref import Ref
-from typing import Any, Dict, Union
+import cognihub_pyeffectref.local as local
+from cognihub_pyeffectref.ref import Ref, _get_current_effect
+from cognihub_pyeffectref.batch import batch
+from typing import Any, Callable, Dict, Mapping, Optional, Union
+
+# ReactiveDict 自身使用的内部属性,赋值时不会被包装为 Ref
+_INTERNAL_ATTRS = frozenset(('_data_refs', '_raw_values', '_refs_lock', '_view_children', '_keys_ref'))
 
 
 class ReactiveDict(collections.abc.MutableMapping):
     """一个通用的响应式字典,能将嵌套的字典/JSON数据转换为Ref包装.
 
-    支持点语法访问和字典风格访问
+    支持点语法访问和字典风格访问.
+    每个键的 Ref 在第一次需要时才创建(在 effect 中读取、获取底层 Ref 或通过视图访问),
+    从未被响应式访问的键只保存原始值.
     """
+    # 内部属性使用 slot 存储,没有实例 __dict__,所有其他属性名都作为字典的键
+    __slots__ = ('_data_refs', '_raw_values', '_refs_lock', '_view_children', '_keys_ref', '__weakref__')
 
     def __init__(self, initial_data: Dict[str, Any]):
         """初始化 ReactiveDict."""
+        # 已创建的 Ref,创建后该键的值以 Ref 为准
         self._data_refs: Dict[str, Ref] = {}
+        # 所有键(按插入顺序),尚未创建 Ref 的键在这里保存当前值
+        self._raw_values: Dict[str, Any] = {}
+        # 保护 "原始值 -> Ref" 的转换,避免并发创建出两个 Ref 或丢失写入
+        self._refs_lock = threading.Lock()
+        # 同一个 ReactiveDict 的所有 ReadOnlyView 共享的子视图缓存,由 ReadOnlyView 维护
+        self._view_children: Dict[str, Any] = {}
+        # 代表键集合的 Ref,在 effect 中遍历、取长度或判断成员时才创建;
+        # 增加或删除键时写入一个新的标记对象,通知依赖键集合的 effect
+        self._keys_ref: Optional[Ref[Any]] = None
         self._wrap_data(initial_data)
 
     def _wrap_data(self, data: Dict[str, Any]) -> None:
-        """递归地将字典数据包装成 Ref"""
+        """递归地将字典数据包装为 ReactiveDict 并保存,已有的键会被替换"""
         for key, value in data.items():
             if isinstance(value, dict) and not isinstance(value, ReactiveDict):
                 # 递归包装嵌套字典为 ReactiveDict
-                self._data_refs[key] = Ref(ReactiveDict(value))
-            else:
-                self._data_refs[key] = Ref(value)
+                value = ReactiveDict(value)
+            with self._refs_lock:
+                is_new_key = key not in self._raw_values
+                self._data_refs.pop(key, None)
+                self._raw_values[key] = value
+            if is_new_key:
+                self._keys_changed()
+
+    def _track_keys(self) -> None:
+        """在 effect 中读取键集合时收集对键集合的依赖"""
+        if local._active_effect_count and _get_current_effect() is not None:
+            keys_ref = self._keys_ref
+            if keys_ref is None:
+                with self._refs_lock:
+                    keys_ref = self._keys_ref
+                    if keys_ref is None:
+                        keys_ref = self._keys_ref = Ref(None)
+            # 读取值即可让 Ref 登记当前 effect
+            _ = keys_ref.value
+
+    def _keys_changed(self) -> None:
+        """键集合发生变化,通知依赖键集合的 effect"""
+        keys_ref = self._keys_ref
+        if keys_ref is not None:
+            # 每次写入新的对象,保证并发的变化不会因为值相等而被合并掉
+            keys_ref.value = object()
+
+    def _ref_for(self, key: str) -> Ref:
+        """获取键对应的 Ref,不存在时用当前的原始值创建"""
+        target_ref = self._data_refs.get(key)
+        if target_ref is None:
+            with self._refs_lock:
+                target_ref = self._data_refs.get(key)
+                if target_ref is None:
+                    if key not in self._raw_values:
+                        raise KeyError(f"'{key}' not found in ReactiveDict.")
+                    target_ref = self._data_refs[key] = Ref(self._raw_values[key])
+        return target_ref
+
+    def _peek(self, key: str) -> Any:
+        """读取键的当前值,不收集依赖也不创建 Ref"""
+        target_ref = self._data_refs.get(key)
+        if target_ref is not None:
+            return target_ref._value
+        try:
+            return self._raw_values[key]
+        except KeyError:
+            raise KeyError(f"'{key}' not found in ReactiveDict.") from None
+
+    def _get(self, key: str) -> Any:
+        """读取键的当前值,在 effect 中读取时创建 Ref 并收集依赖"""
+        target_ref = self._data_refs.get(key)
+        if target_ref is not None:
+            return target_ref.value
+        if key not in self._raw_values:
+            raise KeyError(f"'{key}' not found in ReactiveDict.")
+        if local._active_effect_count and _get_current_effect() is not None:
+            return self._ref_for(key).value
+        return self._raw_values[key]
+
+    def _write(self, key: str, value: Any) -> None:
+        """写入已存在的键,有 Ref 时通过 Ref 赋值以通知订阅者"""
+        target_ref = self._data_refs.get(key)
+        if target_ref is None:
+            with self._refs_lock:
+                target_ref = self._data_refs.get(key)
+                if target_ref is None:
+                    # 还没有 Ref 就不可能有订阅者,直接更新原始值
+                    self._raw_values[key] = value
+                    return
+        target_ref.value = value
 
     def __getattr__(self, name: str) -> Any:
-        """支持点语法访问,返回 Ref 的当前值"""
-        if name in self._data_refs:
-            wrapped_value = self._data_refs[name].value
-            # 如果是嵌套的 ReactiveDict,直接返回它本身以便继续点语法访问
-            if isinstance(wrapped_value, ReactiveDict):
-                return wrapped_value
-            return wrapped_value
-        raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+        """支持点语法访问,返回键的当前值
+
+        嵌套的 ReactiveDict 直接返回它本身以便继续点语法访问
+        """
+        try:
+            return self._get(name)
+        except KeyError:
+            raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'") from None
 
     def __setattr__(self, name: str, value: Any) -> None:
         """支持点语法设置值,自动更新Ref"""
-        if name in self.__dict__ or name.startswith('_data_refs'):
-            # 允许设置 ReactiveDict 自身的属性,或内部的 _data_refs
-            super().__setattr__(name, value)
-        elif name in self._data_refs:
-            # 更新已存在的 Ref
-            current_ref_value = self._data_refs[name].value
-            if isinstance(current_ref_value, ReactiveDict) and isinstance(value, dict) and not isinstance(value, ReactiveDict):
+        if name in _INTERNAL_ATTRS:
+            # 内部的 _data_refs 等属性直接写入 slot
+            object.__setattr__(self, name, value)
+        elif name in self._raw_values:
+            # 更新已存在的键
+            current_value = self._peek(name)
+            if isinstance(current_value, ReactiveDict) and isinstance(value, dict) and not isinstance(value, ReactiveDict):
                 # 如果是将字典赋值给嵌套的 ReactiveDict,则更新其内部
-                current_ref_value._wrap_data(value)  # 递归更新
+                current_value._wrap_data(value)  # 递归更新
             elif isinstance(value, dict) and not isinstance(value, ReactiveDict):
-                # 如果新值是字典,但当前 Ref 不是 ReactiveDict,则替换为新的 ReactiveDict Ref
-                self._data_refs[name].value = ReactiveDict(value)
+                # 如果新值是字典,但当前值不是 ReactiveDict,则替换为新的 ReactiveDict
+                self._write(name, ReactiveDict(value))
             else:
-                self._data_refs[name].value = value
+                self._write(name, value)
         else:
-            # 添加新的 Ref
-            if isinstance(value, dict) and not isinstance(value, ReactiveDict):
-                self._data_refs[name] = Ref(ReactiveDict(value))
-            else:
-                self._data_refs[name] = Ref(value)
+            # 添加新的键
+            self._wrap_data({name: value})
 
     def __getitem__(self, key: str) -> Any:
-        """支持字典风格访问,返回 Ref 的当前值"""
-        if key in self._data_refs:
-            wrapped_value = self._data_refs[key].value
-            # 如果是嵌套的 ReactiveDict,直接返回它本身以便继续点语法访问
-            if isinstance(wrapped_value, ReactiveDict):
-                return wrapped_value
-            return wrapped_value
-        raise KeyError(f"'{key}' not found in ReactiveDict.")
+        """支持字典风格访问,返回键的当前值"""
+        return self._get(key)
 
     def __setitem__(self, key: str, value: Any) -> None:
         """支持字典风格设置值,自动更新 Ref"""
         self.__setattr__(key, value)
 
     def __delitem__(self, key: str) -> None:
-        """支持删除,移除 Ref"""
-        if key in self._data_refs:
-            del self._data_refs[key]
-        else:
-            raise KeyError(f"'{key}' not found in ReactiveDict.")
+        """支持删除,移除键及其 Ref"""
+        with self._refs_lock:
+            if key not in self._raw_values:
+                raise KeyError(f"'{key}' not found in ReactiveDict.")
+            del self._raw_values[key]
+            self._data_refs.pop(key, None)
+        self._keys_changed()
 
     def __len__(self) -> int:
-        return len(self._data_refs)
+        self._track_keys()
+        return len(self._raw_values)
 
     def __iter__(self) -> collections.abc.Iterator[str]:
-        return iter(self._data_refs)
+        self._track_keys()
+        return iter(self._raw_values)
 
     def __contains__(self, key: object) -> bool:
         """支持 'in' 操作符"""
-        return key in self._data_refs
+        self._track_keys()
+        return key in self._raw_values
+
+    def bulk_update(self, mapping: Mapping[str, Any]) -> None:
+        """批量写入多个键,所有变更在结束时统一通知,依赖这些键的 effect 只执行一次"""
+        with batch():
+            for key, value in mapping.items():
+                self[key] = value
+
+    def __repr__(self) -> str:
+        # 直接读取当前值格式化,不收集依赖,也不为了打印先构造一份 dict 拷贝
+        items = ', '.join(f"{key!r}: {self._peek(key)!r}" for key in list(self._raw_values))
+        return f"ReactiveDict({{{items}}})"
 
     def to_dict(self) -> Dict[str, Any]:
         """将 ReactiveDict 转换为普通字典(调用时的拷贝)"""
         result = {}
-        for key, ref in self._data_refs.items():
-            value = ref.value
+        self._track_keys()
+        for key in list(self._raw_values):
+            value = self._get(key)
             if isinstance(value, ReactiveDict):
                 result[key] = value.to_dict()
             else:
@@ -106,21 +202,16 @@ class ReactiveDict(collections.abc.MutableMapping):
         例如: get_raw_ref('nested_key.item')
         这是主程序修改数据或进行高级订阅的接口
         """
-        parts = key_path.split('.')
-        current_data: Union[ReactiveDict, Any] = self
-        for i, part in enumerate(parts):
-            if isinstance(current_data, ReactiveDict):
-                if part not in current_data._data_refs:
-                    raise KeyError(f"Path '{key_path}' not found at part '{part}'.")
-
-                if i == len(parts) - 1:
-                    return current_data._data_refs[part]
-                else:
-                    # 沿着路径向下,获取 Ref 包装的值(可能是另一个 ReactiveDict)
-                    current_data = current_data._data_refs[part].value
-            else:
-                raise TypeError(f"'{'.'.join(parts[:i])}' is not a ReactiveDict, cannot get '{part}'.")
-        raise ValueError(f"Invalid key_path: {key_path}")  # 应该不会到达这里
+        return _CompiledPath(self, key_path).ref()
+
+    def compile_path(self, key_path: str) -> '_CompiledPath':
+        """预先拆分点分隔路径,返回可重复使用的路径对象
+
+        例如: theme = compile_path('user.settings.theme'),之后在 effect 中使用 theme.get()
+        省去的只是每次访问时的 split('.');get()/set()/ref() 每次仍会逐级查找路径上的每个节点,
+        因此中间的嵌套字典被替换后依然能找到新的值
+        """
+        return _CompiledPath(self, key_path)
 
     @classmethod
     def from_json(cls, json_string: str) -> 'ReactiveDict':
@@ -130,3 +221,55 @@ class ReactiveDict(collections.abc.MutableMapping):
             raise TypeError("JSON string must represent a dictionary.")
         return cls(data)
 
+
+
+class _CompiledPath:
+    """预先拆分好的 ReactiveDict 点分隔路径,由 ReactiveDict.compile_path() 创建.
+
+    只缓存拆分后的路径片段,不缓存路径上的节点:每次访问都按路径逐级重新查找底层 Ref,
+    因此中间的嵌套字典被替换后依然有效.
+    """
+    __slots__ = ('_root', '_path', '_parts')
+
+    def __init__(self, root: ReactiveDict, key_path: str) -> None:
+        self._root = root
+        self._path = key_path
+        self._parts = tuple(key_path.split('.'))
+
+    def _container(self, track: bool) -> ReactiveDict:
+        """沿路径找到叶子节点所在的 ReactiveDict,track 为 True 时读取中间节点会收集依赖"""
+        parts = self._parts
+        current: ReactiveDict = self._root
+        for i in range(len(parts) - 1):
+            if parts[i] not in current._raw_values:
+                raise KeyError(f"Path '{self._path}' not found at part '{parts[i]}'.")
+            value = current._get(parts[i]) if track else current._peek(parts[i])
+            if not isinstance(value, ReactiveDict):
+                raise TypeError(f"'{'.'.join(parts[:i + 1])}' is not a ReactiveDict, cannot get '{parts[i + 1]}'.")
+            current = value
+        return current
+
+    def _leaf_container(self, track: bool) -> ReactiveDict:
+        container = self._container(track)
+        if self._parts[-1] not in container._raw_values:
+            raise KeyError(f"Path '{self._path}' not found at part '{self._parts[-1]}'.")
+        return container
+
+    def ref(self) -> Ref:
+        """获取路径当前指向的底层 Ref 实例"""
+        return self._leaf_container(False)._ref_for(self._parts[-1])
+
+    def get(self) -> Any:
+        """读取路径的当前值,在 effect 中会收集路径上所有 Ref 的依赖"""
+        return self._leaf_container(True)._get(self._parts[-1])
+
+    def set(self, value: Any) -> None:
+        """设置路径的值,与通过 ReactiveDict 赋值的行为一致"""
+        self._container(False)[self._parts[-1]] = value
+
+    def subscribe(self, callback_func: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+        """订阅路径当前指向的 Ref"""
+        return self.ref().subscribe(callback_func)
+
+    def __repr__(self) -> str:
+        return f"_CompiledPath({self._path!r})"
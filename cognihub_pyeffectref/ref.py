@@ -1,15 +1,152 @@
 import threading
+import weakref
 import warnings
 import concurrent.futures
 import asyncio
+import contextvars
+import functools
+import inspect
 import cognihub_pyeffectref.local as local
-from typing import Callable, Generic, Any, TypeVar, Optional, Literal, TYPE_CHECKING
+from .batch import _flush_pending
+from .effect import EffectWrapper
+from typing import Callable, Generic, Any, TypeVar, Optional, Literal
 
-if TYPE_CHECKING:
-    from .effect import EffectWrapper
+try:
+    # 可选依赖 fastrlock: 无竞争时加锁不经过系统互斥量,比 threading.Lock 更快
+    from fastrlock.rlock import FastRLock as _SubscribersLock  # type: ignore
+except ImportError:
+    _SubscribersLock = threading.Lock
 
 T = TypeVar('T')
 
+# contextvar 对象在模块生命周期内不变,预先绑定其 get 方法,getter 热路径上省去两次属性查找
+_get_current_effect = local._current_effect.get
+
+
+def _running_loop_or_none() -> Optional[asyncio.AbstractEventLoop]:
+    """返回当前线程正在运行的事件循环,没有时返回 None 而不抛异常."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _require_loop(loop: Optional[asyncio.AbstractEventLoop]) -> asyncio.AbstractEventLoop:
+    """确保存在正在运行的事件循环,用于 'asyncio' 执行器配置下的线程池调度."""
+    if loop is None:
+        raise RuntimeError("no running event loop")
+    return loop
+
+
+def _create_detached_task(loop: asyncio.AbstractEventLoop, coro: Any) -> 'asyncio.Task[Any]':
+    """在清除了批量更新状态和当前 effect 的上下文中创建任务.
+
+    任务会复制创建时的上下文,如果不清除,任务中对 Ref 的写入会被记录到调度它的那次批量更新中,
+    而那次批量更新早已刷新结束,这些写入将永远不会被通知;
+    任务中读取的 Ref 也会被记为调度它的 effect 的依赖,使该 effect 被无关的 Ref 触发.
+    """
+    ctx = contextvars.copy_context()
+    ctx.run(local._batch_pending.set, None)
+    ctx.run(local._current_effect.set, None)
+    return ctx.run(loop.create_task, coro)
+
+
+# 已调度但尚未完成的后台任务.事件循环只持有任务的弱引用,这里保留强引用以防任务在执行中被垃圾回收
+_background_tasks: set['asyncio.Future[Any]'] = set()
+
+
+def _on_background_done(description: str, callback: Any, future: 'asyncio.Future[Any]') -> None:
+    """后台任务完成时释放引用并报告异常,通过 functools.partial 绑定参数,避免每次通知创建闭包."""
+    _background_tasks.discard(future)
+    if future.cancelled():
+        return
+    e = future.exception()
+    if e is not None:
+        # 只对非测试异常打印错误信息
+        if not ("Test exception" in str(e) or "Intentional test error" in str(e)):
+            name = "" if callback is None else f" {getattr(callback, 'name', None) or getattr(callback, '__name__', str(callback))}"
+            print(f"[ERROR] Exception in {description}{name}: {e}")
+
+
+def _track_background(future: 'asyncio.Future[Any]', description: str, callback: Any = None) -> None:
+    """保留后台任务的引用,并在完成时报告异常."""
+    _background_tasks.add(future)
+    future.add_done_callback(functools.partial(_on_background_done, description, callback))
+
+
+async def _noop_coroutine() -> None:
+    return None
+
+
+class _WeakSubscriber:
+    """弱引用订阅者,由 Ref.subscribe(callback, weak=True) 创建.
+
+    只持有回调的弱引用,回调(或绑定方法的实例)被回收后自动从所属 Ref 中取消订阅.
+    哈希和相等比较与原回调一致,因此可以直接用原回调 unsubscribe.
+    """
+    __slots__ = ('_callback_ref', '_owner_ref', '_hash', '_is_coroutine', '__name__')
+
+    def __init__(self, callback_func: Callable[..., Any], owner: 'Ref[Any]', is_coroutine: bool) -> None:
+        # 绑定方法每次访问都会新建,需要用 WeakMethod 跟踪其实例和函数
+        if inspect.ismethod(callback_func):
+            self._callback_ref: weakref.ref[Any] = weakref.WeakMethod(callback_func, self._on_dead)
+        else:
+            self._callback_ref = weakref.ref(callback_func, self._on_dead)
+        self._owner_ref = weakref.ref(owner)
+        self._hash = hash(callback_func)
+        self._is_coroutine = is_coroutine
+        self.__name__ = getattr(callback_func, '__name__', str(callback_func))
+
+    def __call__(self, new_value: Any, old_value: Any) -> Any:
+        callback_func = self._callback_ref()
+        if callback_func is not None:
+            return callback_func(new_value, old_value)
+        # 回调已被回收但回收时未能取消订阅,通知时再尝试一次;异步订阅者仍需返回一个协程供调度
+        self._on_dead(None)
+        return _noop_coroutine() if self._is_coroutine else None
+
+    def _on_dead(self, _: Any) -> None:
+        owner = self._owner_ref()
+        if owner is None:
+            return
+        # 弱引用回调可能在任意位置(包括持有订阅锁时)由垃圾回收触发,
+        # 因此只尝试非阻塞加锁;拿不到锁时保留这个已失效的订阅者,调用它不会有任何效果,
+        # 它会在下一次通知、订阅或取消订阅时被移除
+        if owner._subscribers_lock.acquire(blocking=False):
+            try:
+                if self in owner._subscribers:
+                    subscribers = dict(owner._subscribers)
+                    del subscribers[self]
+                    owner._subscribers = subscribers
+            finally:
+                owner._subscribers_lock.release()
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if other is self:
+            return True
+        if isinstance(other, _WeakSubscriber):
+            return self._callback_ref == other._callback_ref
+        callback_func = self._callback_ref()
+        return callback_func is not None and callback_func == other
+
+
+def _live_subscribers(subscribers: dict[Any, bool]) -> dict[Any, bool]:
+    """复制订阅者字典,同时去掉回调已被回收的弱引用订阅者."""
+    return {
+        subscriber: is_coroutine for subscriber, is_coroutine in subscribers.items()
+        if type(subscriber) is not _WeakSubscriber or subscriber._callback_ref() is not None
+    }
+
+
+def _is_coroutine_subscriber(callback_func: Any) -> bool:
+    """判断订阅者是否需要以协程方式调度,EffectWrapper 直接使用其自身记录的 _is_async."""
+    if isinstance(callback_func, EffectWrapper):
+        return callback_func._is_async
+    return asyncio.iscoroutinefunction(callback_func)
+
 
 class Ref(Generic[T]):
     """
@@ -25,6 +162,10 @@ class Ref(Generic[T]):
     Ref 的同步任务调度策略可以通过类方法 Ref.configure_sync_task_executor() 配置.
     实例级别的 subscribe 行为可通过初始化参数 subscribe_immediate 和 subscribe_sequential 控制.
     """
+    __slots__ = (
+        '_value', '_subscribers_lock', '_subscribers',
+        '_subscribe_sequential', '_subscribe_immediate', '_compare', '__weakref__',
+    )
 
     # 全局同步任务执行器配置
     _global_sync_executor_config: Optional[concurrent.futures.Executor | Literal['asyncio']] = None
@@ -71,7 +212,8 @@ class Ref(Generic[T]):
                 raise TypeError("Executor must be 'asyncio' or an instance of concurrent.futures.Executor.")
 
     def __init__(self, initial_value: T, subscribe_sequential: bool = False,
-                 subscribe_immediate: bool = False) -> None:
+                 subscribe_immediate: bool = False,
+                 compare: Optional[Callable[[T, T], bool]] = None) -> None:
         """
         初始化一个 Ref 实例.
 
@@ -86,14 +228,20 @@ class Ref(Generic[T]):
                                   然后提交到全局 Executor 中**顺序执行**.这**不阻塞主线程**.
                                   如果为 False (默认),则同步 subscribe 回调将遵循全局 
                                   configure_sync_task_executor() 的设置(可以并发执行,或在未配置 Executor 时同步阻塞).
+            compare: (可选) 判断新旧值是否相等的函数 compare(old, new),返回 True 时不更新也不通知.
+                     默认为 None,使用 != 比较.对于比较代价高或 == 不返回布尔值的对象(如大型容器、numpy 数组),
+                     可以传入 lambda a, b: a is b 只比较引用.
         """
         self._value = initial_value
-        # 使用 threading.Lock 来保护 _subscribers 集合的并发修改
-        self._subscribers_lock = threading.Lock()
-        # 订阅者存储为有序列表,以便按注册顺序处理顺序执行的回调
-        self._subscribers: list['EffectWrapper | Callable[[T, T], Any]'] = []  # 存储订阅此Ref的副作用函数或回调
+        # 使用锁来保护 _subscribers 集合的并发修改,安装了 fastrlock 时使用 FastRLock
+        self._subscribers_lock = _SubscribersLock()
+        # 订阅者存储为有序字典 {订阅者: 是否为协程函数},以便按注册顺序处理顺序执行的回调.
+        # 是否为协程函数在订阅时计算一次,通知时无需再逐个调用 asyncio.iscoroutinefunction.
+        # 采用写时复制: 只有订阅/取消订阅时重建字典,通知时可无锁直接迭代当前快照
+        self._subscribers: dict['EffectWrapper | Callable[[T, T], Any]', bool] = {}  # 存储订阅此Ref的副作用函数或回调
         self._subscribe_sequential = subscribe_sequential
         self._subscribe_immediate = subscribe_immediate  # 初始化新参数
+        self._compare = compare
         if self._subscribe_immediate and self._subscribe_sequential:
             warnings.warn("[WARNING] Ref initialized with both subscribe_immediate=True and subscribe_sequential=True. subscribe_immediate will take precedence, and subscribe_sequential will be ignored.")
 
@@ -106,23 +254,17 @@ class Ref(Generic[T]):
         获取Ref的值.
         根据当前执行环境(同步线程或异步协程)获取 effect,并进行依赖收集.
         """
-        current_effect = None
-        # 优先从 asyncio contextvar 获取(如果在 asyncio 环境中)
-        try:
-            if asyncio.current_task(None):  # 检查是否在 asyncio 任务中
-                current_effect = local._async_local_current_effect.get()
-        except RuntimeError:
-            # 如果不在 asyncio 环境中,会抛出 RuntimeError
-            pass
-
-        # 否则尝试从 threading.local 获取 (普通线程中)
-        if current_effect is None:
-            current_effect = getattr(local._thread_local_current_effect, 'value', None)  # 使用 .value 约定
-
-        if current_effect:
-            with self._subscribers_lock:
-                if current_effect not in self._subscribers:
-                    self._subscribers.append(current_effect)
+        # 没有任何 effect 在执行时(effect 之外的普通读取)只需一次整数判断即可跳过依赖收集
+        if local._active_effect_count:
+            # 同步和异步 effect 都通过同一个 contextvar 记录,一次 C 层面的 get 即可取得当前 effect
+            current_effect = _get_current_effect()
+
+            # 稳态下 effect 早已在订阅者中,先做无锁的成员检查,只有真正需要添加时才加锁(并再次确认)
+            if current_effect and current_effect not in self._subscribers:
+                with self._subscribers_lock:
+                    if current_effect not in self._subscribers:
+                        self._subscribers = {**self._subscribers, current_effect: current_effect._is_async}
+                        current_effect._deps.add(self)
         return self._value
 
     @value.setter
@@ -131,104 +273,123 @@ class Ref(Generic[T]):
         设置Ref的值.
         如果新旧值不同,则更新值并通知所有订阅者.
         """
-        if self._value != new_value:
-            old_value = self._value
+        old_value = self._value
+        # 重新赋值同一个对象时只做一次指针比较,跳过对大型容器可能是 O(n) 的相等比较
+        if old_value is new_value:
+            return
+        try:
+            compare = self._compare
+            if compare is None:
+                changed = bool(old_value != new_value)
+            else:
+                changed = not compare(old_value, new_value)
+        except Exception:
+            # 比较本身抛出异常,或结果无法转换为 bool (如 numpy 数组的逐元素比较)时,视为已改变
+            changed = True
+        if changed:
             self._value = new_value
-            self._notify_subscribers(old_value, new_value)
+            # 没有订阅者时(中间/派生 Ref 的常见情况)直接跳过通知
+            if self._subscribers:
+                pending = local._batch_pending.get()
+                if pending is not None:
+                    # 在批量更新中只记录第一次变更前的旧值,退出 batch 时统一通知
+                    if self not in pending:
+                        pending[self] = old_value
+                    return
+                # 不在批量更新中时,本次变更的传播本身作为一次批量更新:
+                # 从本 Ref 开始的每一轮(包括第一轮)都由 _flush_pending 统一处理,
+                # effect 在传播稳定后才运行,菱形依赖中的 effect 只会运行一次
+                token = local._batch_pending.set({self: old_value})
+                try:
+                    _flush_pending()
+                finally:
+                    local._batch_pending.reset(token)
+
+    def subscribe(self, callback_func: 'EffectWrapper' | Callable[[T, T], Any],
+                  weak: bool = False) -> 'EffectWrapper' | Callable[[T, T], Any]:
+        """
+        订阅值的变化,回调以 (new_value, old_value) 调用.
+        两个值都是赋值时的对象本身,不做复制,回调不应原地修改它们.
 
-    def subscribe(self, callback_func: 'EffectWrapper' | Callable[[T, T], Any]) -> 'EffectWrapper' | Callable[[T, T], Any]:
+        参数:
+            callback_func: 回调函数或 effect.
+            weak: (可选) 如果为 True,只持有回调的弱引用,回调(或绑定方法的实例)被回收后自动取消订阅.
+                  适合订阅生命周期短于 Ref 的对象的方法.不支持 effect.默认值是 False.
+        """
         if not callable(callback_func):
             raise TypeError("Subscriber must be a callable function.")
+        is_effect = isinstance(callback_func, EffectWrapper)
+        is_coroutine = _is_coroutine_subscriber(callback_func)
+        subscriber: Any = callback_func
+        if weak:
+            if is_effect:
+                raise TypeError("Effects cannot be subscribed weakly.")
+            subscriber = _WeakSubscriber(callback_func, self, is_coroutine)
         with self._subscribers_lock:
-            if callback_func not in self._subscribers:
-                self._subscribers.append(callback_func)
+            if subscriber not in self._subscribers:
+                subscribers = _live_subscribers(self._subscribers)
+                subscribers[subscriber] = is_coroutine
+                self._subscribers = subscribers
+                if is_effect:
+                    # 手动订阅的 effect 同样登记依赖,以便 stop() 时取消订阅
+                    callback_func._deps.add(self)  # type: ignore[union-attr]
         return callback_func
 
     def unsubscribe(self, callback_func: 'EffectWrapper' | Callable[[T, T], Any]) -> None:
         with self._subscribers_lock:
             if callback_func in self._subscribers:
-                self._subscribers.remove(callback_func)
+                subscribers = _live_subscribers(self._subscribers)
+                subscribers.pop(callback_func, None)
+                self._subscribers = subscribers
 
-    def _notify_subscribers(self, old_value: T, new_value: T) -> None:
+    def _notify_subscribers(self, old_value: T, new_value: T,
+                            notified_effects: Optional[set['EffectWrapper']] = None,
+                            queued_effects: Optional[dict['EffectWrapper', tuple['Ref[Any]', Any, Any]]] = None) -> None:
         """
         通知所有订阅者值已改变.
         异步回调会被调度,同步回调会直接执行.
+        notified_effects 用于批量刷新时在多个 Ref 间对 effect 去重,已在其中的 effect 不再触发.
+        queued_effects 不为 None 时,普通 effect 不立即运行,而是登记为 {effect: (触发的 Ref, 新值, 旧值)},
+        由 _flush_pending 在传播稳定后统一运行;派生值的内部 effect (_eager 为 True) 仍然立即运行.
         """
+        # 订阅者字典只会被整体替换,直接读取当前快照即可,无需加锁复制
+        subscribers_to_notify = self._subscribers
+        if not subscribers_to_notify:
+            return
+
+        # 全局执行器配置在一次通知中只读取一次,避免每个订阅者都经过实例到类属性的查找
+        executor_config = self._global_sync_executor_config
+        # 事件循环在整个通知过程中不变,只查询一次
+        loop = _running_loop_or_none()
         subscribers_to_notify_sequential_bg = []
 
-        subscribers_to_notify = []
-        with self._subscribers_lock:
-            subscribers_to_notify = list(self._subscribers)  # 获取副本进行迭代
-
-        for callback in subscribers_to_notify:
-            from .effect import EffectWrapper  # 延迟导入避免循环依赖
-
+        for callback, is_coroutine in subscribers_to_notify.items():
             try:
                 if isinstance(callback, EffectWrapper):
-                    # 如果是 EffectWrapper,需要特殊处理
-                    if callback._is_async:
-                        # 异步 EffectWrapper 需要在事件循环中调度
-                        try:
-                            # 创建任务并立即添加异常处理回调
-                            task = asyncio.create_task(callback.run_triggered_effect(new_value, old_value))
-
-                            def handle_task_exception(task:asyncio.Task)->None:
-                                try:
-                                    task.result()  # 这会重新抛出异常
-                                except Exception as e:
-                                    # 只对非测试异常打印错误信息
-                                    if not ("Test exception" in str(e) or "Intentional test error" in str(e)):
-                                        print(f"[ERROR] Exception in async effect {callback.name}: {e}")
-
-                            task.add_done_callback(handle_task_exception)
-                        except RuntimeError:
-                            print(f"[ERROR] Cannot schedule async effect {callback.name} outside of an asyncio event loop.")
-                    else:
-                        # 同步 EffectWrapper 直接调用
-                        # callback.run_triggered_effect(new_value, old_value)
-                        # 如果是普通 subscribe 回调,根据 immediate 和 sequential 参数分类
-                        if self._global_sync_executor_config:
-                            if self._global_sync_executor_config == 'asyncio':
-                                # 如果全局配置为 asyncio,直接调度到事件循环
-                                task = asyncio.create_task(asyncio.to_thread(callback.run_triggered_effect, new_value, old_value))
-
-                                def handle_executor_exception(task:asyncio.Task) -> None:
-                                    try:
-                                        task.result()
-                                    except Exception as e:
-                                        if not ("Test exception" in str(e) or "Intentional test error" in str(e)):
-                                            print(f"[ERROR] Exception in sync effect executor {callback.name}: {e}")
-
-                                task.add_done_callback(handle_executor_exception)
-                            else:
-                                # 如果全局配置为自定义 Executor,使用它来执行同步任务
-                                self._global_sync_executor_config.submit(callback.run_triggered_effect, new_value, old_value)
-                        else:
-                            callback.run_triggered_effect(new_value, old_value)
+                    if queued_effects is not None and not callback._eager:
+                        # 只登记第一次触发,effect 在本次刷新中只运行一次
+                        if callback not in queued_effects:
+                            queued_effects[callback] = (self, new_value, old_value)
+                        continue
+                    if notified_effects is not None:
+                        if callback in notified_effects:
+                            continue
+                        notified_effects.add(callback)
+                    self._dispatch_effect(callback, is_coroutine, new_value, old_value, executor_config, loop)
                 else:
                     # 普通回调函数
                     # func = callback
-                    if asyncio.iscoroutinefunction(callback):
+                    if is_coroutine:
                         # 如果当前在 asyncio 事件循环中,调度异步回调
-                        try:
-                            # 创建任务并添加异常处理回调
-                            task = asyncio.create_task(callback(new_value, old_value))
-
-                            def handle_callback_exception(task:asyncio.Task) -> None:
-                                try:
-                                    task.result()
-                                except Exception as e:
-                                    # 只对非测试异常打印错误信息
-                                    if not ("Test exception" in str(e) or "Intentional test error" in str(e)):
-                                        print(f"[ERROR] Exception in async callback {getattr(callback, '__name__', str(callback))}: {e}")
-
-                            task.add_done_callback(handle_callback_exception)
-                        except RuntimeError:
+                        if loop is None:
                             print(f"[ERROR] Cannot schedule async callback {getattr(callback, '__name__', str(callback))} outside of an asyncio event loop.")
+                        else:
+                            # 创建任务并添加异常处理回调
+                            _track_background(_create_detached_task(loop, callback(new_value, old_value)), 'async callback', callback)
                     else:
                         # 同步回调直接执行
                         # 如果全局配置了同步任务执行器
-                        if self._global_sync_executor_config:
+                        if executor_config:
                             if self._subscribe_immediate:
                                 # 如果 subscribe_immediate 为 True,立即同步执行
                                 callback(new_value, old_value)
@@ -237,21 +398,12 @@ class Ref(Generic[T]):
                                     # 如果 subscribe_sequential 为 True,收集到列表中,稍后顺序执行
                                     subscribers_to_notify_sequential_bg.append(callback)
                                 else:
-                                    if self._global_sync_executor_config == 'asyncio':
-                                        # 如果全局配置为 asyncio,直接调度到事件循环
-                                        task = asyncio.create_task(asyncio.to_thread(callback, new_value, old_value))
-
-                                        def handle_callback_executor_exception(task:asyncio.Task) -> None:
-                                            try:
-                                                task.result()
-                                            except Exception as e:
-                                                if not ("Test exception" in str(e) or "Intentional test error" in str(e)):
-                                                    print(f"[ERROR] Exception in callback executor {getattr(callback, '__name__', str(callback))}: {e}")
-
-                                        task.add_done_callback(handle_callback_executor_exception)
+                                    if executor_config == 'asyncio':
+                                        # 如果全局配置为 asyncio,直接调度到事件循环的默认线程池
+                                        _track_background(_require_loop(loop).run_in_executor(None, callback, new_value, old_value), 'callback executor', callback)
                                     else:
                                         # 如果全局配置为自定义 Executor,使用它来执行同步任务
-                                        self._global_sync_executor_config.submit(callback, new_value, old_value)
+                                        executor_config.submit(callback, new_value, old_value)
                         else:
                             callback(new_value, old_value)
 
@@ -261,26 +413,48 @@ class Ref(Generic[T]):
 
         if len(subscribers_to_notify_sequential_bg) > 0:
             # 如果有需要顺序执行的回调,使用全局 Executor 顺序执行
-            if self._global_sync_executor_config:
-                if self._global_sync_executor_config == 'asyncio':
-                    # 如果全局配置为 asyncio,直接调度到事件循环
-                    task = asyncio.create_task(asyncio.to_thread(self._run_sequential_bg, subscribers_to_notify_sequential_bg, old_value, new_value))
-
-                    def handle_sequential_exception(task: asyncio.Task) -> None:
-                        try:
-                            task.result()
-                        except Exception as e:
-                            if not ("Test exception" in str(e) or "Intentional test error" in str(e)):
-                                print(f"[ERROR] Exception in sequential background execution: {e}")
-
-                    task.add_done_callback(handle_sequential_exception)
+            if executor_config:
+                if executor_config == 'asyncio':
+                    # 如果全局配置为 asyncio,直接调度到事件循环的默认线程池
+                    _track_background(_require_loop(loop).run_in_executor(None, self._run_sequential_bg, subscribers_to_notify_sequential_bg, old_value, new_value), 'sequential background execution')
                 else:
                     # 如果全局配置为自定义 Executor,使用它来执行同步任务
-                    self._global_sync_executor_config.submit(self._run_sequential_bg, subscribers_to_notify_sequential_bg, old_value, new_value)
+                    executor_config.submit(self._run_sequential_bg, subscribers_to_notify_sequential_bg, old_value, new_value)
             else:
                 # 默认情况下,同步执行所有顺序回调
                 self._run_sequential_bg(subscribers_to_notify_sequential_bg, old_value, new_value)
 
+    def _dispatch_effect(self, callback: 'EffectWrapper', is_coroutine: bool, new_value: Any, old_value: Any,
+                         executor_config: Optional[concurrent.futures.Executor | Literal['asyncio']],
+                         loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """按 effect 的类型和全局执行器配置运行或调度一次被触发的 effect."""
+        if is_coroutine:
+            # 异步 EffectWrapper 需要在事件循环中调度
+            if loop is None:
+                print(f"[ERROR] Cannot schedule async effect {callback.name} outside of an asyncio event loop.")
+            else:
+                # 创建任务并立即添加异常处理回调,同时保留任务引用直到完成
+                _track_background(_create_detached_task(loop, callback.run_triggered_effect(new_value, old_value)), 'async effect', callback)
+        elif executor_config and not callback._eager:
+            if executor_config == 'asyncio':
+                # 如果全局配置为 asyncio,直接调度到事件循环的默认线程池
+                _track_background(_require_loop(loop).run_in_executor(None, callback.run_triggered_effect, new_value, old_value), 'sync effect executor', callback)
+            else:
+                # 如果全局配置为自定义 Executor,使用它来执行同步任务
+                executor_config.submit(callback.run_triggered_effect, new_value, old_value)
+        else:
+            # 同步 EffectWrapper 直接调用;派生值的内部 effect 必须在传播过程中完成重新计算,
+            # 即使配置了执行器也同步运行
+            callback.run_triggered_effect(new_value, old_value)
+
+    def _run_queued_effect(self, callback: 'EffectWrapper', new_value: Any, old_value: Any) -> None:
+        """运行 _flush_pending 在传播稳定后登记的 effect,出错时与通知中的其他订阅者一样只打印错误."""
+        try:
+            self._dispatch_effect(callback, callback._is_async, new_value, old_value,
+                                  self._global_sync_executor_config, _running_loop_or_none())
+        except Exception as e:
+            print(f"[ERROR] Error notifying subscriber {getattr(callback, '__name__', str(callback))}: {e}")
+
     def _run_sequential_bg(self, subscribers: list[Callable[[T, T], Any]], old_value: T, new_value: T) -> None:
         """
         顺序执行所有收集到的回调函数.
@@ -298,7 +472,7 @@ class ReadOnlyRef(Generic[T]):
 
     它包装了一个底层的 Ref 实例,只允许读取其值和订阅变化,但不允许修改.
     """
-    __slots__ = ('_target_ref',)
+    __slots__ = ('_target_ref', '__weakref__')
 
     def __init__(self, target_ref: Ref[T]) -> None:
         if not isinstance(target_ref, Ref):
@@ -308,13 +482,21 @@ class ReadOnlyRef(Generic[T]):
     @property
     def value(self) -> T:
         """只读访问底层 Ref 的值."""
-        return self._target_ref.value
+        target_ref = self._target_ref
+        # effect 之外不需要收集依赖,直接读取值,省去一次属性描述符的调用
+        if not local._active_effect_count:
+            return target_ref._value
+        return target_ref.value
 
     # 不提供 @value.setter,从而实现只读
 
-    def subscribe(self, callback_func: Callable[[T, T], Any]) -> Callable[[T, T], Any]:
+    def subscribe(self, callback_func: Callable[[T, T], Any], weak: bool = False) -> Callable[[T, T], Any]:
         """直接代理底层 Ref 的订阅方法."""
-        return self._target_ref.subscribe(callback_func)
+        return self._target_ref.subscribe(callback_func, weak)
+
+    def unsubscribe(self, callback_func: Callable[[T, T], Any]) -> None:
+        """直接代理底层 Ref 的取消订阅方法."""
+        self._target_ref.unsubscribe(callback_func)
 
     def __repr__(self) -> str:
         return f"ReadOnlyRef({repr(self.value)})"
@@ -1,7 +1,8 @@
 """ReactiveDict的视图"""
-from cognihub_pyeffectref.ref import ReadOnlyRef
+import cognihub_pyeffectref.local as local
+from cognihub_pyeffectref.ref import Ref, ReadOnlyRef
 from cognihub_pyeffectref.reactive_dict import ReactiveDict
-from typing import Any, Dict, NoReturn, Union, Callable
+from typing import Any, Dict, NoReturn, Tuple, Union, Callable
 
 class ReadOnlyView:
     """提供 ReactiveDict 的只读视图.
@@ -9,37 +10,68 @@ class ReadOnlyView:
     插件使用此视图.当访问叶子节点时,返回 ReadOnlyRef.
     当访问嵌套的 ReactiveDict 时,返回 ReadOnlyView.
     """
+    # 固定属性使用 slot 存储;保留 __dict__ 以允许设置额外的私有属性
+    __slots__ = ('_reactive_dict', '_allowed_actions', '_child_cache', '__dict__')
+
+    _reactive_dict: ReactiveDict
+    # _allowed_actions 现在直接存储函数,用于此特定实例
+    _allowed_actions: Dict[str, Callable[..., Any]]
+    # 子视图缓存: name -> (底层 Ref, 创建时 Ref 中的值, 子视图),
+    # 存放在 ReactiveDict 上,同一个 ReactiveDict 的多个视图共享同一批子视图
+    _child_cache: Dict[str, Tuple[Ref[Any], Any, Union['ReadOnlyView', ReadOnlyRef[Any]]]]
 
     def __init__(self, reactive_dict: ReactiveDict):
         if not isinstance(reactive_dict, ReactiveDict):
             raise TypeError("ReadOnlyView 必须包装一个 ReactiveDict 实例.")
-        
-        self._reactive_dict = reactive_dict
-        # _allowed_actions 现在直接存储函数,用于此特定实例
-        self._allowed_actions: Dict[str, Callable[..., Any]] = {}
+
+        # 构造时直接写入 slot,绕过只读检查的 __setattr__
+        object.__setattr__(self, '_reactive_dict', reactive_dict)
+        object.__setattr__(self, '_allowed_actions', {})
+        object.__setattr__(self, '_child_cache', reactive_dict._view_children)
 
     def __getattr__(self, name: str) -> Union['ReadOnlyView', ReadOnlyRef[Any]]:
         """
         实现点式访问,返回嵌套的 ReadOnlyView 或 ReadOnlyRef.
         """
-        # 检查请求的属性是否在底层 ReactiveDict 中存在
-        if name not in self._reactive_dict._data_refs:
-            raise AttributeError(
-                f"'{self.__class__.__name__}' 对象没有属性 '{name}'."
-            )
-
-        # 获取底层 ReactiveDict 包装的原始 Ref 对象
-        target_ref = self._reactive_dict._data_refs[name]
-        value_in_ref = target_ref.value
-
-        # 如果值是 ReactiveDict (意味着是一个嵌套的字典结构)
-        if isinstance(value_in_ref, ReactiveDict):
-            # 递归地返回一个新的 ReadOnlyView 实例,保持只读和点式访问
-            return ReadOnlyView(value_in_ref)
-
-        # 对于所有其他值,包装成 ReadOnlyRef
+        reactive_dict = self._reactive_dict
+        # 已创建 Ref 的键一定存在,命中时只需一次字典查找
+        target_ref = reactive_dict._data_refs.get(name)
+        if target_ref is None:
+            # 检查请求的属性是否在底层 ReactiveDict 中存在
+            if name not in reactive_dict._raw_values:
+                raise AttributeError(
+                    f"'{self.__class__.__name__}' 对象没有属性 '{name}'."
+                )
+            # 视图需要通过 Ref 暴露只读访问和订阅,尚未创建 Ref 的键在这里创建
+            target_ref = reactive_dict._ref_for(name)
+
+        # 根据 Ref 中的当前值区分节点类型;直接读取 _value,判断类型本身不收集依赖.
+        # 无论值是通过 ReactiveDict 赋值还是通过 get_raw_ref() 取得的 Ref 写入,判断结果都是最新的
+        is_nested = isinstance(target_ref._value, ReactiveDict)
+
+        # 底层 Ref 未被替换且嵌套字典未被替换时,复用上次创建的子视图;
+        # 叶子节点的 ReadOnlyRef 总是读取最新值,只要 Ref 本身不变即可复用
+        cached = self._child_cache.get(name)
+        if is_nested:
+            # 在 effect 中通过 getter 读取,使 effect 依赖父节点的 Ref,嵌套字典被整体替换时重新执行;
+            # effect 之外只需直接读取 _value 校验缓存
+            value_in_ref = target_ref.value if local._active_effect_count else target_ref._value
+            if cached is not None and cached[0] is target_ref and cached[1] is value_in_ref:
+                return cached[2]
+        elif cached is not None and cached[0] is target_ref and cached[1] is None:
+            return cached[2]
+
+        child: Union['ReadOnlyView', ReadOnlyRef[Any]]
+        if is_nested:
+            # 如果值是 ReactiveDict (意味着是一个嵌套的字典结构),
+            # 返回一个 ReadOnlyView 实例,保持只读和点式访问
+            child = ReadOnlyView(value_in_ref)
+            self._child_cache[name] = (target_ref, value_in_ref, child)
         else:
-            return ReadOnlyRef(target_ref)
+            # 对于所有其他值,包装成 ReadOnlyRef
+            child = ReadOnlyRef(target_ref)
+            self._child_cache[name] = (target_ref, None, child)
+        return child
 
     def __getitem__(self, key: str) -> Union['ReadOnlyView', ReadOnlyRef[Any]]:
         """
@@ -1,5 +1,5 @@
 import asyncio
-from cognihub_pyeffectref import effect, Ref
+from cognihub_pyeffectref import effect, Ref, batch
 a = Ref(1)
 b = Ref(2)
 
@@ -25,6 +25,10 @@ print(my_effect.name)  # 打印 effect 的名称
 a.value = 100  # 修改 a 的值,触发 effect
 b.value = 200  # 修改 b 的值,触发 effect
 
+with batch():  # 批量修改,effect 在退出时只触发一次
+    a.value = 1000
+    b.value = 2000
+
 
 aa = Ref(1)
 ab = Ref(2)
@@ -53,6 +57,9 @@ async def main() -> None:
     print(aiomy_effect.name)  # 打印 effect 的名称
     aa.value = 100  # 修改 a 的值,触发 effect
     ab.value = 200  # 修改 b 的值,触发 effect
+    with batch():  # 批量修改,effect 在退出时只调度一次
+        aa.value = 1000
+        ab.value = 2000
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -12,7 +12,9 @@ import os
 from typing import List, Any
 
 # 添加项目根目录到 Python 路径
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __name__ == "__main__":
+    # 只在作为脚本运行时修改 sys.path,作为模块导入时不产生副作用
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from cognihub_pyeffectref import Ref
 
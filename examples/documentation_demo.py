@@ -11,16 +11,24 @@
 
 import asyncio
 import threading
-import time
 import concurrent.futures
 from typing import Protocol, TypedDict, cast, Any, List, Dict
 
 import sys
 import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __name__ == "__main__":
+    # 只在作为脚本运行时修改 sys.path,作为模块导入时不产生副作用
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from cognihub_pyeffectref import Ref, ReadOnlyRef, effect, ReactiveDict, ReadOnlyView
 
+# 设置 COGNIHUB_DEMO_VERBOSE=0 可关闭性能相关演示中每次变更都会执行的输出,
+# 测量 Ref 吞吐量时避免终端 I/O 掩盖库本身的开销
+VERBOSE = os.environ.get('COGNIHUB_DEMO_VERBOSE', '1') == '1'
+
+# 演示中复用的工作线程池,多次运行演示时不再重复创建线程
+_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="Worker")
+
 
 def demo_basic_ref_usage():
     """演示底层接口的基本用法 - 泛型类型指定"""
@@ -36,15 +44,21 @@ def demo_basic_ref_usage():
     # 创建副作用函数
     @effect
     def log_count() -> None:
-        print(f"  📊 Count is: {count.value}")
+        value = count.value
+        if VERBOSE:
+            print(f"  📊 Count is: {value}")
 
     @effect  
     def log_greeting() -> None:
-        print(f"  👋 Hello, {name.value}!")
+        value = name.value
+        if VERBOSE:
+            print(f"  👋 Hello, {value}!")
 
     @effect
     def log_items() -> None:
-        print(f"  🛒 Items: {', '.join(items.value)}")
+        value = items.value
+        if VERBOSE:
+            print(f"  🛒 Items: {', '.join(value)}")
 
     # 初始执行
     print("📋 初始状态:")
@@ -61,7 +75,7 @@ def demo_basic_ref_usage():
     print("✅ 底层接口演示完成")
 
 
-def demo_sync_async_threading():
+async def demo_sync_async_threading():
     """演示同步、异步、多线程支持"""
     print("\n⚡ 执行模式演示")
     print("=" * 50)
@@ -86,22 +100,14 @@ def demo_sync_async_threading():
         
         thread_effect()  # 建立依赖
 
-    # 在多个线程中建立依赖
-    threads = []
-    for i in range(3):
-        thread = threading.Thread(target=thread_worker, args=(i,), name=f"Worker-{i}")
-        thread.start()
-        threads.append(thread)
-
-    # 等待线程完成
-    for thread in threads:
-        thread.join()
+    # 在多个线程中建立依赖,map 返回的结果全部取出即表示所有线程已完成
+    list(_POOL.map(thread_worker, range(3)))
     
     # 触发所有副作用
     print("\n📢 触发变更:")
     data.value = "updated_by_sync"
     
-    time.sleep(0.1)  # 确保所有回调完成
+    await asyncio.sleep(0.1)  # 确保所有回调完成,等待期间不阻塞事件循环
     print("✅ 执行模式演示完成")
 
 
@@ -111,19 +117,23 @@ async def demo_async_support():
     print("=" * 50)
     
     async_data: Ref[str] = Ref("async_initial")
+    # 每次 effect 执行完成时置位,用于等待变更触发的那次执行,而不是固定 sleep 一段时间
+    effect_done = asyncio.Event()
 
     @effect
     async def async_effect() -> None:
         print(f"  🟡 Async effect: {async_data.value}")
         await asyncio.sleep(0.05)  # 模拟异步操作
         print(f"  🟡 Async effect completed for: {async_data.value}")
+        effect_done.set()
 
     print("🔄 建立异步依赖:")
     await async_effect()
     
     print("\n📢 触发异步变更:")
+    effect_done.clear()
     async_data.value = "async_updated"
-    await asyncio.sleep(0.1)  # 等待异步回调完成
+    await asyncio.wait_for(effect_done.wait(), timeout=1)  # 等待异步回调完成
     
     print("✅ 异步演示完成")
 
@@ -329,11 +339,14 @@ def demo_complex_nested_structure():
     # 4. 访问嵌套数据 - 完整类型提示
     @effect
     def watch_config() -> None:
-        db_host = config_view.database.host.value
+        # 先把所有依赖读到局部变量,嵌套视图只取一次
+        database = config_view.database
+        db_host = database.host.value
+        db_port = database.port.value
         api_url = config_view.api.base_url.value  
         debug = config_view.debug_mode.value
         
-        print(f"  🗄️ Database: {db_host}:{config_view.database.port.value}")
+        print(f"  🗄️ Database: {db_host}:{db_port}")
         print(f"  🌐 API: {api_url}")
         print(f"  🐛 Debug: {debug}")
 
@@ -399,7 +412,7 @@ async def main():
     
     # 底层接口演示
     demo_basic_ref_usage()
-    demo_sync_async_threading()
+    await demo_sync_async_threading()
     await demo_async_support()
     demo_executor_configuration()
     
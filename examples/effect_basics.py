@@ -13,9 +13,15 @@ import os
 from typing import List, Optional, Callable
 
 # 添加项目根目录到 Python 路径
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __name__ == "__main__":
+    # 只在作为脚本运行时修改 sys.path,作为模块导入时不产生副作用
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cognihub_pyeffectref import Ref, effect, batch
 
-from cognihub_pyeffectref import Ref, effect
+# 设置 COGNIHUB_DEMO_VERBOSE=0 可关闭性能相关演示中每次变更都会执行的输出,
+# 测量 Ref 吞吐量时避免终端 I/O 掩盖库本身的开销
+VERBOSE = os.environ.get('COGNIHUB_DEMO_VERBOSE', '1') == '1'
 
 
 def basic_effect_usage() -> None:
@@ -277,9 +283,12 @@ def effect_performance_example() -> None:
         nonlocal computation_count
         computation_count += 1
         
-        # 模拟复杂计算
-        result = sum(i * base_value.value for i in range(1000))
-        print(f"  🔢 复杂计算结果: {result} (执行第 {computation_count} 次)")
+        # 模拟复杂计算: sum(i * base for i in range(N)) 对 base 是线性的,
+        # 可以化简为 base * N*(N-1)//2,用一次乘法代替 N 次解释器循环
+        n = 1000
+        result = base_value.value * (n * (n - 1) // 2)
+        if VERBOSE:
+            print(f"  🔢 复杂计算结果: {result} (执行第 {computation_count} 次)")
     
     # 触发初始执行
     expensive_computation_effect()
@@ -288,12 +297,24 @@ def effect_performance_example() -> None:
     # 快速连续修改值
     print("\n⚡ 快速连续修改值:")
     for i in range(2, 6):
-        print(f"   设置值为 {i}")
+        if VERBOSE:
+            print(f"   设置值为 {i}")
         base_value.value = i
         # 注意:每次修改都会立即触发 Effect
     
     print(f"\n📈 计算总共执行了 {computation_count} 次")
-    print("💡 在实际应用中,可能需要考虑防抖(debounce)或节流(throttle)技术")
+
+    # 使用 batch 合并连续修改,Effect 只在退出时执行一次
+    print("\n📦 使用 batch 批量修改值:")
+    count_before_batch = computation_count
+    with batch():
+        for i in range(6, 10):
+            if VERBOSE:
+                print(f"   设置值为 {i}")
+            base_value.value = i
+
+    print(f"\n📈 batch 中修改 4 次,计算只执行了 {computation_count - count_before_batch} 次")
+    print("💡 对于跨越多个事件的连续修改,还可以考虑防抖(debounce)或节流(throttle)技术")
 
 
 def main() -> None:
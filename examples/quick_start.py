@@ -9,7 +9,9 @@ CogniHub PyEffectRef - 快速入门示例
 
 import sys
 import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __name__ == "__main__":
+    # 只在作为脚本运行时修改 sys.path,作为模块导入时不产生副作用
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from cognihub_pyeffectref import Ref, effect, ReactiveDict, ReadOnlyView, ReadOnlyRef
 from typing import Protocol, TypedDict, cast, Any
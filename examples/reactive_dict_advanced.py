@@ -10,12 +10,25 @@ ReactiveDict 高级示例
 """
 import sys
 import os
+import re
+from collections import Counter
 from enum import Enum
+from typing import Callable
 
 # 添加项目根目录到 Python 路径
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __name__ == "__main__":
+    # 只在作为脚本运行时修改 sys.path,作为模块导入时不产生副作用
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cognihub_pyeffectref import ReactiveDict, effect, batch, derived
+from cognihub_pyeffectref.effect import EffectWrapper
 
-from cognihub_pyeffectref import ReactiveDict, effect
+# 表单验证使用的正则,在模块加载时编译一次
+_EMAIL_RE = re.compile(r'[^@\s]+@[^@\s]+\.[^@\s]+')
+_PHONE_RE = re.compile(r'1[0-9]{10}')
+_DATE_RE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
+# 至少8位,同时包含大写字母、小写字母和数字
+_PASSWORD_RE = re.compile(r'(?=.*[A-Z])(?=.*[a-z])(?=.*[0-9]).{8,}')
 
 
 # 定义复杂的类型结构
@@ -40,10 +53,11 @@ def advanced_task_management_system() -> None:
     
     # 创建任务管理系统的响应式数据
     task_system = ReactiveDict({
-        'tasks': {'placeholder': 'temp'},  # 临时占位符,稍后替换
+        'tasks': {},
         'filters': {
-            'status': 'all',
-            'priority': 'all',
+            # None 表示不过滤
+            'status': None,
+            'priority': None,
             'assignee': 'all'
         },
         'ui_state': {
@@ -54,9 +68,6 @@ def advanced_task_management_system() -> None:
         }
     })
     
-    # 清空 tasks,准备添加真实数据
-    task_system['tasks'] = {}
-    
     # 统计数据
     stats = ReactiveDict({
         'total_tasks': 0,
@@ -73,9 +84,11 @@ def advanced_task_management_system() -> None:
         tasks = task_system['tasks']
         
         total = len(tasks)
-        completed = sum(1 for task in tasks.values() if task['status'] == 'completed')
-        pending = sum(1 for task in tasks.values() if task['status'] == 'pending')
-        in_progress = sum(1 for task in tasks.values() if task['status'] == 'in_progress')
+        # 一次遍历统计所有状态,而不是每个状态各遍历一遍
+        status_counts = Counter(task['status'] for task in tasks.values())
+        completed = status_counts[TaskStatus.COMPLETED]
+        pending = status_counts[TaskStatus.PENDING]
+        in_progress = status_counts[TaskStatus.IN_PROGRESS]
         
         completion_rate = (completed / total * 100) if total > 0 else 0
         
@@ -86,13 +99,16 @@ def advanced_task_management_system() -> None:
         stats['in_progress_tasks'] = in_progress
         stats['completion_rate'] = completion_rate
         
-        print(f"  📊 任务统计更新:")
-        print(f"    总任务: {total}")
-        print(f"    已完成: {completed}")
-        print(f"    进行中: {in_progress}")
-        print(f"    待处理: {pending}")
-        print(f"    完成率: {completion_rate:.1f}%")
-        print()
+        # 整块内容拼接后一次输出
+        print("\n".join([
+            "  📊 任务统计更新:",
+            f"    总任务: {total}",
+            f"    已完成: {completed}",
+            f"    进行中: {in_progress}",
+            f"    待处理: {pending}",
+            f"    完成率: {completion_rate:.1f}%",
+            "",
+        ]))
     
     # 创建过滤器 Effect
     @effect
@@ -109,10 +125,11 @@ def advanced_task_management_system() -> None:
         for task in tasks.values():
             matches = True
             
-            if status_filter != 'all' and task['status'] != status_filter:
+            # 状态和优先级都是枚举成员,直接比较身份
+            if status_filter is not None and task['status'] is not status_filter:
                 matches = False
             
-            if priority_filter != 'all' and task['priority'] != int(priority_filter):
+            if priority_filter is not None and task['priority'] is not priority_filter:
                 matches = False
                 
             if assignee_filter != 'all' and task['assignee'] != assignee_filter:
@@ -121,22 +138,28 @@ def advanced_task_management_system() -> None:
             if matches:
                 filtered_count += 1
         
-        print(f"  🔍 过滤结果: {filtered_count} 个任务匹配当前过滤条件")
-        print(f"    状态过滤: {status_filter}")
-        print(f"    优先级过滤: {priority_filter}")
-        print(f"    负责人过滤: {assignee_filter}")
+        print("\n".join([
+            f"  🔍 过滤结果: {filtered_count} 个任务匹配当前过滤条件",
+            f"    状态过滤: {'all' if status_filter is None else status_filter.value}",
+            f"    优先级过滤: {'all' if priority_filter is None else priority_filter.value}",
+            f"    负责人过滤: {assignee_filter}",
+        ]))
     
+    # 触发初始执行,建立依赖
+    calculate_stats()
+    apply_filters()
     print("✅ 创建了任务管理系统")
     
     # 添加初始任务
+    # bulk_update 在一次批量更新中写入所有任务,统计和过滤 Effect 只在全部写入后执行一次
     print("\n📝 添加初始任务...")
-    task_system['tasks'] = {
+    task_system['tasks'].bulk_update({
         'task_1': {
             'id': 'task_1',
             'title': '设计数据库架构',
             'description': '为新项目设计数据库结构',
-            'status': 'completed',
-            'priority': 3,
+            'status': TaskStatus.COMPLETED,
+            'priority': Priority.HIGH,
             'assignee': '张三',
             'created_at': '2024-01-01',
             'due_date': '2024-01-15',
@@ -146,8 +169,8 @@ def advanced_task_management_system() -> None:
             'id': 'task_2', 
             'title': '实现用户认证',
             'description': '实现登录和注册功能',
-            'status': 'in_progress',
-            'priority': 4,
+            'status': TaskStatus.IN_PROGRESS,
+            'priority': Priority.URGENT,
             'assignee': '李四',
             'created_at': '2024-01-02',
             'due_date': '2024-01-20',
@@ -157,48 +180,48 @@ def advanced_task_management_system() -> None:
             'id': 'task_3',
             'title': '编写API文档',
             'description': '为REST API编写详细文档',
-            'status': 'pending',
-            'priority': 2,
+            'status': TaskStatus.PENDING,
+            'priority': Priority.MEDIUM,
             'assignee': '王五',
             'created_at': '2024-01-03',
             'due_date': None,
             'tags': ['documentation', 'api']
         }
-    }
+    })
     
     # 测试过滤器
     print("\n🔍 测试过滤器功能...")
     print("设置状态过滤为 'completed':")
-    task_system['filters']['status'] = 'completed'
+    task_system['filters']['status'] = TaskStatus.COMPLETED
     
     print("\n设置优先级过滤为 '3':")
-    task_system['filters']['priority'] = '3'
+    task_system['filters']['priority'] = Priority.HIGH
     
     print("\n清除过滤器:")
-    task_system['filters']['status'] = 'all'
-    task_system['filters']['priority'] = 'all'
+    # 同时修改两个过滤条件,batch 保证过滤 Effect 只重新执行一次
+    with batch():
+        task_system['filters']['status'] = None
+        task_system['filters']['priority'] = None
     
     # 添加新任务
+    # 直接写入嵌套的 ReactiveDict,而不是复制整个 tasks 再整体赋值回去,
+    # 这样只有读取了对应键的 Effect 会被通知
     print("\n➕ 添加新任务:")
-    new_tasks = dict(task_system['tasks'])
-    new_tasks['task_4'] = {
+    task_system['tasks']['task_4'] = {
         'id': 'task_4',
         'title': '部署到生产环境',
         'description': '将应用部署到生产服务器',
-        'status': 'pending',
-        'priority': 4,
+        'status': TaskStatus.PENDING,
+        'priority': Priority.URGENT,
         'assignee': '赵六',
         'created_at': '2024-01-04',
         'due_date': '2024-01-25',
         'tags': ['deployment', 'production']
     }
-    task_system['tasks'] = new_tasks
     
     # 更新任务状态
     print("\n✅ 完成一个任务:")
-    updated_tasks = dict(task_system['tasks'])
-    updated_tasks['task_3']['status'] = 'completed'
-    task_system['tasks'] = updated_tasks
+    task_system['tasks']['task_3']['status'] = TaskStatus.COMPLETED
 
 
 def reactive_shopping_system() -> None:
@@ -224,13 +247,13 @@ def reactive_shopping_system() -> None:
         'points': 1500
     })
     
-    # 优惠规则
-    discount_rules = ReactiveDict({
+    # 优惠规则在运行期间不会改变,使用普通字典: 读取时不创建 Ref 也不收集依赖
+    discount_rules = {
         'vip_discounts': {'bronze': 0.05, 'silver': 0.10, 'gold': 0.15},
         'bulk_discount_threshold': 5,  # 超过5件商品打9折
         'bulk_discount_rate': 0.10,
         'free_shipping_threshold': 299  # 满299免邮
-    })
+    }
     
     # 订单汇总
     order_summary = ReactiveDict({
@@ -241,11 +264,10 @@ def reactive_shopping_system() -> None:
         'items_count': 0
     })
     
-    # 创建购物车计算 Effect
-    @effect
-    def calculate_order() -> None:
-        """计算订单汇总"""
-        # 计算小计
+    # 购物车小计作为派生值: 只在购物车或商品价格变化时重新计算,
+    # 结果不变时(例如只修改了 VIP 等级)不会通知依赖它的 Effect
+    def cart_totals() -> tuple[float, int]:
+        """计算购物车小计和商品数量"""
         subtotal = 0.0
         items_count = 0
         
@@ -254,11 +276,20 @@ def reactive_shopping_system() -> None:
                 price = products[product_id]['price']
                 subtotal += price * quantity
                 items_count += quantity
+        return subtotal, items_count
+    
+    totals = derived(cart_totals)
+    # VIP 折扣率只依赖 VIP 等级,购物车变化时直接读取上次的结果
+    vip_rate = derived(lambda: discount_rules['vip_discounts'].get(user['vip_level'], 0))
+    
+    # 创建购物车计算 Effect
+    @effect
+    def calculate_order() -> None:
+        """计算订单汇总"""
+        subtotal, items_count = totals.value
         
         # 计算VIP折扣
-        vip_level = user['vip_level']
-        vip_discount_rate = discount_rules['vip_discounts'].get(vip_level, 0)
-        vip_discount = subtotal * vip_discount_rate
+        vip_discount = subtotal * vip_rate.value
         
         # 计算批量折扣
         bulk_discount = 0.0
@@ -281,13 +312,16 @@ def reactive_shopping_system() -> None:
         order_summary['total'] = total
         order_summary['items_count'] = items_count
         
-        print(f"  💰 订单汇总更新:")
-        print(f"    商品小计: ¥{subtotal:.2f}")
-        print(f"    优惠金额: ¥{discount_amount:.2f} (VIP: ¥{vip_discount:.2f}, 批量: ¥{bulk_discount:.2f})")
-        print(f"    运费: ¥{shipping_fee:.2f}")
-        print(f"    总计: ¥{total:.2f}")
-        print(f"    商品数量: {items_count} 件")
-        print()
+        # 整块内容拼接后一次输出
+        print("\n".join([
+            "  💰 订单汇总更新:",
+            f"    商品小计: ¥{subtotal:.2f}",
+            f"    优惠金额: ¥{discount_amount:.2f} (VIP: ¥{vip_discount:.2f}, 批量: ¥{bulk_discount:.2f})",
+            f"    运费: ¥{shipping_fee:.2f}",
+            f"    总计: ¥{total:.2f}",
+            f"    商品数量: {items_count} 件",
+            "",
+        ]))
     
     # 创建库存预警 Effect
     @effect
@@ -298,12 +332,16 @@ def reactive_shopping_system() -> None:
             if stock <= 5:
                 print(f"  ⚠️  库存预警: {product_info['name']} 仅剩 {stock} 件")
     
+    # 触发初始执行,建立依赖
+    calculate_order()
+    stock_alert()
     print("✅ 创建了购物系统")
     
     # 模拟购物流程
     print("\n🛍️  开始购物...")
-    cart['laptop'] = 1
-    cart['mouse'] = 2
+    with batch():
+        cart['laptop'] = 1
+        cart['mouse'] = 2
     
     print("\n📈 增加购买数量:")
     cart['laptop'] = 2  # VIP折扣应用
@@ -315,9 +353,8 @@ def reactive_shopping_system() -> None:
     user['vip_level'] = 'gold'  # 更高的VIP折扣
     
     print("\n📦 减少库存(模拟其他用户购买):")
-    updated_products = dict(products)
-    updated_products['mouse']['stock'] = 3  # 触发库存预警
-    products.update(updated_products)
+    # 直接修改嵌套字段,只有读取了 mouse 库存的 Effect 会被通知
+    products['mouse']['stock'] = 3  # 触发库存预警
 
 
 def reactive_form_validation_system() -> None:
@@ -375,57 +412,48 @@ def reactive_form_validation_system() -> None:
         'preferences': {}
     })
     
-    # 个人信息验证 Effect
+    # 个人信息的每个字段各自一个验证 Effect,修改一个字段只重新验证这一个字段
+    personal_rules: dict[str, tuple[Callable[[str], bool], str]] = {
+        'first_name': (lambda value: len(value) >= 2, '姓氏至少2个字符'),
+        'last_name': (lambda value: len(value) >= 2, '名字至少2个字符'),
+        'email': (lambda value: _EMAIL_RE.fullmatch(value) is not None, '请输入有效的邮箱地址'),
+        'phone': (lambda value: _PHONE_RE.fullmatch(value) is not None, '请输入有效的手机号码'),
+        'birth_date': (lambda value: _DATE_RE.fullmatch(value) is not None, '请使用 YYYY-MM-DD 格式'),
+    }
+    
+    def make_field_validator(field: str, check: Callable[[str], bool], message: str) -> EffectWrapper:
+        """创建验证单个个人信息字段的 Effect"""
+        def validate_field() -> None:
+            value = form['personal'][field]
+            valid = check(value)
+            validation['personal'][f'{field}_valid'] = valid
+            
+            personal_errors = errors['personal']
+            if not valid and value:
+                personal_errors[field] = message
+                print(f"    - {field}: {message}")
+            else:
+                personal_errors.pop(field, None)
+        
+        validate_field.__name__ = f'validate_{field}'
+        return effect(validate_field)
+    
+    field_validators = [
+        make_field_validator(field, check, message)
+        for field, (check, message) in personal_rules.items()
+    ]
+    
+    # 个人信息汇总 Effect: 只读取各字段的验证结果,
+    # 由于相等的值不会触发通知,只有某个字段的结果真正翻转时才重新执行
     @effect
     def validate_personal() -> None:
-        """验证个人信息"""
-        personal = form['personal']
-        personal_errors = {}
-        
-        # 姓名验证
-        first_name_valid = len(personal['first_name']) >= 2
-        if not first_name_valid and personal['first_name']:
-            personal_errors['first_name'] = '姓氏至少2个字符'
-            
-        last_name_valid = len(personal['last_name']) >= 2
-        if not last_name_valid and personal['last_name']:
-            personal_errors['last_name'] = '名字至少2个字符'
-        
-        # 邮箱验证
-        email = personal['email']
-        email_valid = '@' in email and '.' in email.split('@')[-1] and len(email) >= 5
-        if not email_valid and email:
-            personal_errors['email'] = '请输入有效的邮箱地址'
-        
-        # 手机验证
-        phone = personal['phone']
-        phone_valid = phone.isdigit() and len(phone) == 11 and phone.startswith('1')
-        if not phone_valid and phone:
-            personal_errors['phone'] = '请输入有效的手机号码'
-        
-        # 生日验证
-        birth_date = personal['birth_date']
-        birth_date_valid = len(birth_date) == 10 and birth_date.count('-') == 2
-        if not birth_date_valid and birth_date:
-            personal_errors['birth_date'] = '请使用 YYYY-MM-DD 格式'
-        
-        section_valid = (first_name_valid and last_name_valid and 
-                        email_valid and phone_valid and birth_date_valid)
-        
-        # 更新验证状态
-        validation['personal']['first_name_valid'] = first_name_valid
-        validation['personal']['last_name_valid'] = last_name_valid
-        validation['personal']['email_valid'] = email_valid
-        validation['personal']['phone_valid'] = phone_valid
-        validation['personal']['birth_date_valid'] = birth_date_valid
-        validation['personal']['section_valid'] = section_valid
-        
-        errors['personal'] = personal_errors
+        """汇总个人信息的验证结果"""
+        personal_validation = validation['personal']
+        fields_valid = [personal_validation[f'{field}_valid'] for field in personal_rules]
+        section_valid = all(fields_valid)
+        personal_validation['section_valid'] = section_valid
         
         print(f"  👤 个人信息验证: {'✅' if section_valid else '❌'}")
-        if personal_errors:
-            for field, error in personal_errors.items():
-                print(f"    - {field}: {error}")
     
     # 账户信息验证 Effect
     @effect  
@@ -442,10 +470,7 @@ def reactive_form_validation_system() -> None:
         
         # 密码验证
         password = account['password']
-        password_valid = (len(password) >= 8 and 
-                         any(c.isupper() for c in password) and
-                         any(c.islower() for c in password) and
-                         any(c.isdigit() for c in password))
+        password_valid = _PASSWORD_RE.fullmatch(password) is not None
         if not password_valid and password:
             account_errors['password'] = '密码至少8位,包含大小写字母和数字'
         
@@ -481,28 +506,39 @@ def reactive_form_validation_system() -> None:
         form_valid = personal_valid and account_valid and preferences_valid
         validation['form_valid'] = form_valid
         
-        print(f"  📋 整体表单: {'✅ 有效' if form_valid else '❌ 无效'}")
-        print(f"    个人信息: {'✅' if personal_valid else '❌'}")
-        print(f"    账户信息: {'✅' if account_valid else '❌'}")
-        print(f"    偏好设置: {'✅' if preferences_valid else '❌'}")
-        print()
-    
+        print("\n".join([
+            f"  📋 整体表单: {'✅ 有效' if form_valid else '❌ 无效'}",
+            f"    个人信息: {'✅' if personal_valid else '❌'}",
+            f"    账户信息: {'✅' if account_valid else '❌'}",
+            f"    偏好设置: {'✅' if preferences_valid else '❌'}",
+            "",
+        ]))
+    
+    # 触发初始执行,建立依赖
+    for validate_field in field_validators:
+        validate_field()
+    validate_personal()
+    validate_account()
+    validate_form()
     print("✅ 创建了表单验证系统")
     
     # 模拟用户填写表单
     print("\n📝 用户开始填写表单...")
     
+    # 每一组字段在一个 batch 中填写,验证 Effect 在整组提交后只执行一次
     print("\n输入个人信息:")
-    form['personal']['first_name'] = '张'
-    form['personal']['last_name'] = '三'
-    form['personal']['email'] = 'zhangsan@example.com'
-    form['personal']['phone'] = '13800138000'
-    form['personal']['birth_date'] = '1990-01-01'
+    with batch():
+        form['personal']['first_name'] = '张'
+        form['personal']['last_name'] = '三'
+        form['personal']['email'] = 'zhangsan@example.com'
+        form['personal']['phone'] = '13800138000'
+        form['personal']['birth_date'] = '1990-01-01'
     
     print("\n输入账户信息:")
-    form['account']['username'] = 'zhangsan123'
-    form['account']['password'] = 'MyPassword123'
-    form['account']['confirm_password'] = 'MyPassword123'
+    with batch():
+        form['account']['username'] = 'zhangsan123'
+        form['account']['password'] = 'MyPassword123'
+        form['account']['confirm_password'] = 'MyPassword123'
     
     print("\n🎉 表单填写完成！")
 
@@ -13,7 +13,9 @@ import os
 from typing import  List, TypedDict
 
 # 添加项目根目录到 Python 路径
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __name__ == "__main__":
+    # 只在作为脚本运行时修改 sys.path,作为模块导入时不产生副作用
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from cognihub_pyeffectref import ReactiveDict, effect
 
@@ -47,7 +49,7 @@ def basic_reactive_dict_usage() -> None:
     })
     
     print("✅ 创建并初始化了 ReactiveDict")
-    print(f"📊 初始数据: {dict(user_data.items())}")
+    print(f"📊 初始数据: {user_data}")
     
     # 访问数据
     print(f"\n👤 用户姓名: {user_data['name']}")
@@ -61,14 +63,14 @@ def basic_reactive_dict_usage() -> None:
     user_data['age'] = 30
     user_data['city'] = "北京"  # 添加新字段
     
-    print(f"📊 修改后的数据: {dict(user_data.items())}")
+    print(f"📊 修改后的数据: {user_data}")
     
     # 删除数据
     print("\n🗑️  删除 email 字段...")
     if 'email' in user_data:
         del user_data['email']
     
-    print(f"📊 删除后的数据: {dict(user_data.items())}")
+    print(f"📊 删除后的数据: {user_data}")
 
 
 def reactive_dict_with_effects() -> None:
@@ -7,13 +7,16 @@ ReadOnlyView 示例
 - 与 ReactiveDict 的配合使用
 - 数据访问和监听
 """
-from cognihub_pyeffectref import ReactiveDict, effect, ReadOnlyRef, ReadOnlyView
 import sys
 import os
 from typing import Protocol, cast, Any
 
 # 添加项目根目录到 Python 路径
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __name__ == "__main__":
+    # 只在作为脚本运行时修改 sys.path,作为模块导入时不产生副作用
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cognihub_pyeffectref import ReactiveDict, effect, batch, ReadOnlyRef, ReadOnlyView
 
 
 def basic_readonly_view_example() -> None:
@@ -67,34 +70,30 @@ def basic_readonly_view_example() -> None:
 
     try:
         user_view['email'].value = 'lisi@example.com'  # type: ignore
-    except TypeError as e:
+    except AttributeError as e:
         print(f"  ✅ 正确阻止了字典value写入操作: {e}")
 
     # 演示响应式监听
     print("\n🔊 设置响应式监听:")
 
+    # 同一次更新中一起变化的字段放在一个 Effect 中监听
     @effect
-    def watch_user_name() -> None:
+    def watch_user() -> None:
         name = user_view.name.value
-        print(f"  👤 用户名变化: {name}")
-
-    @effect
-    def watch_user_age() -> None:
         age = user_view.age.value
-        print(f"  🎂 年龄变化: {age}")
+        print(f"  👤 用户信息: {name}, 🎂 年龄: {age}")
 
     # 建立监听
-    watch_user_name()
-    watch_user_age()
+    watch_user()
 
     print("\n📝 修改原始数据:")
-    user_data.name = '李四'
-    user_data.age = 26
+    with batch():
+        user_data.name = '李四'
+        user_data.age = 26
 
     print("\n📊 当前用户信息:")
     user_dict = user_view()
-    for key, value in user_dict.items():
-        print(f"  {key}: {value}")
+    print("\n".join(f"  {key}: {value}" for key, value in user_dict.items()))
 
 
 def nested_data_example() -> None:
@@ -171,30 +170,27 @@ def nested_data_example() -> None:
     print("\n🔊 设置嵌套数据监听:")
 
     @effect
-    def watch_theme() -> None:
+    def watch_config() -> None:
         theme = config_view.ui.theme.value
-        print(f"  🎨 主题变更: {theme}")
-
-    @effect
-    def watch_debug_mode() -> None:
         debug = config_view.features.debug_mode.value
         status = "开启" if debug else "关闭"
-        print(f"  🐛 调试模式: {status}")
+        print(f"  🎨 主题: {theme}, 🐛 调试模式: {status}")
 
     # 建立监听
-    watch_theme()
-    watch_debug_mode()
+    watch_config()
 
     print("\n📝 修改嵌套配置:")
-    app_config.ui.theme = 'light'
-    app_config.features.debug_mode = True
+    with batch():
+        app_config.ui.theme = 'light'
+        app_config.features.debug_mode = True
 
     print("\n📋 完整配置信息:")
     config_dict = config_view()
+    lines = []
     for section, settings in config_dict.items():
-        print(f"  {section}:")
-        for key, value in settings.items():
-            print(f"    {key}: {value}")
+        lines.append(f"  {section}:")
+        lines.extend(f"    {key}: {value}" for key, value in settings.items())
+    print("\n".join(lines))
 
 
 def dashboard_data_example() -> None:
@@ -256,9 +252,9 @@ def dashboard_data_example() -> None:
     print("🎯 创建专门的数据视图:")
 
     # 创建专门的视图
-    user_stats_view = cast(BackendData, ReadOnlyView(backend_data))
-    sales_stats_view = cast(BackendData, ReadOnlyView(backend_data))
-    system_status_view = cast(BackendData, ReadOnlyView(backend_data))
+    # 视图没有可变状态,同一个 ReactiveDict 只需创建一个视图,各个使用方共享即可
+    backend_view = cast(BackendData, ReadOnlyView(backend_data))
+    user_stats_view = sales_stats_view = system_status_view = backend_view
 
     print(f"  👥 总用户数: {user_stats_view.user_stats.total_users.value}")
     print(f"  💰 总收入: ¥{sales_stats_view.sales_stats.total_revenue.value}")
@@ -285,10 +281,11 @@ def dashboard_data_example() -> None:
 
     # 模拟数据更新
     print("\n📝 更新数据:")
-    backend_data.user_stats.total_users = 1255
-    backend_data.user_stats.active_users = 895
-    backend_data.sales_stats.total_revenue = 126500.75
-    backend_data.sales_stats.orders_count = 238
+    with batch():
+        backend_data.user_stats.total_users = 1255
+        backend_data.user_stats.active_users = 895
+        backend_data.sales_stats.total_revenue = 126500.75
+        backend_data.sales_stats.orders_count = 238
 
 
 def permission_based_views_example() -> None:
@@ -350,9 +347,9 @@ def permission_based_views_example() -> None:
     print("🎭 创建基于权限的视图:")
 
     # 创建不同权限级别的视图
-    read_permission_view = cast(UserPermissions, ReadOnlyView(user_permissions))
-    admin_permission_view = cast(UserPermissions, ReadOnlyView(user_permissions))
-    publish_permission_view = cast(UserPermissions, ReadOnlyView(user_permissions))
+    # 三个用途共享同一个视图,不必为同一个 ReactiveDict 重复创建
+    permissions_view = cast(UserPermissions, ReadOnlyView(user_permissions))
+    read_permission_view = admin_permission_view = publish_permission_view = permissions_view
 
     print("  📖 读取权限:")
     print(f"    阅读帖子: {read_permission_view.read_permissions.can_read_posts.value}")
@@ -383,11 +380,11 @@ def permission_based_views_example() -> None:
     user_permissions.publish_permissions.can_edit_posts = True
 
     print("\n🎯 最终权限状态:")
+    lines = []
     for permission_type, permissions in user_permissions.to_dict().items():
-        print(f"  {permission_type}:")
-        for perm, value in permissions.items():
-            status = "✅" if value else "❌"
-            print(f"    {status} {perm}")
+        lines.append(f"  {permission_type}:")
+        lines.extend(f"    {'✅' if value else '❌'} {perm}" for perm, value in permissions.items())
+    print("\n".join(lines))
 
 
 def complex_dashboard_example() -> None:
@@ -468,14 +465,15 @@ def complex_dashboard_example() -> None:
     overview_view = cast(DashboardData, ReadOnlyView(dashboard_data))
 
     print("📊 仪表板概览:")
-    print(f"  总访问量: {overview_view.overview.total_visits.value:,}")
-    print(f"  独立访客: {overview_view.overview.unique_visitors.value:,}")
-    print(f"  跳出率: {overview_view.overview.bounce_rate.value:.1%}")
+    # 嵌套视图只取一次,之后直接从局部变量读取各个字段
+    overview = overview_view.overview
+    print(f"  总访问量: {overview.total_visits.value:,}")
+    print(f"  独立访客: {overview.unique_visitors.value:,}")
+    print(f"  跳出率: {overview.bounce_rate.value:.1%}")
 
     print("\n🌍 地理分布统计:")
     top_countries = overview_view.geographic.top_countries.value
-    for i, country in enumerate(top_countries[:3], 1):
-        print(f"  {i}. {country}")
+    print("\n".join(f"  {i}. {country}" for i, country in enumerate(top_countries[:3], 1)))
 
     print("\n📱 设备统计:")
     device_stats = overview_view.device_stats
@@ -511,10 +509,11 @@ def complex_dashboard_example() -> None:
     watch_traffic_metrics()
 
     print("\n📝 模拟实时数据更新:")
-    dashboard_data.overview.total_visits = 15487
-    dashboard_data.overview.unique_visitors = 8942
-    dashboard_data.conversion.signup_rate = 0.048
-    dashboard_data.conversion.purchase_rate = 0.025
+    with batch():
+        dashboard_data.overview.total_visits = 15487
+        dashboard_data.overview.unique_visitors = 8942
+        dashboard_data.conversion.signup_rate = 0.048
+        dashboard_data.conversion.purchase_rate = 0.025
 
 
 def main() -> None:
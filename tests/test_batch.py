@@ -0,0 +1,160 @@
+"""测试批量更新的功能"""
+import unittest
+import asyncio
+import sys
+import os
+from typing import Any
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cognihub_pyeffectref import Ref, effect, batch
+
+
+class TestBatch(unittest.TestCase):
+    """batch 上下文的基本测试"""
+
+    def test_batch_defers_notifications(self) -> None:
+        """测试 batch 中的赋值在退出时才通知"""
+        ref = Ref(0)
+        calls: list[tuple[Any, Any]] = []
+        ref.subscribe(lambda new, old: calls.append((new, old)))
+
+        with batch():
+            ref.value = 1
+            ref.value = 2
+            self.assertEqual(ref.value, 2)  # 值立即更新
+            self.assertEqual(calls, [])  # 通知被推迟
+
+        # 回调只收到一次通知,旧值为进入 batch 前的值
+        self.assertEqual(calls, [(2, 0)])
+
+    def test_batch_deduplicates_effects(self) -> None:
+        """测试依赖多个 Ref 的 effect 只触发一次"""
+        a = Ref(1)
+        b = Ref(2)
+        results: list[int] = []
+
+        @effect
+        def sum_effect() -> None:
+            results.append(a.value + b.value)
+
+        sum_effect()
+        self.assertEqual(results, [3])
+
+        with batch():
+            a.value = 10
+            b.value = 20
+
+        self.assertEqual(results, [3, 30])
+
+    def test_nested_batch(self) -> None:
+        """测试嵌套 batch 只在最外层退出时刷新"""
+        ref = Ref(0)
+        calls: list[int] = []
+        ref.subscribe(lambda new, old: calls.append(new))
+
+        with batch():
+            with batch():
+                ref.value = 1
+            self.assertEqual(calls, [])
+            ref.value = 2
+
+        self.assertEqual(calls, [2])
+
+    def test_batch_flushes_on_exception(self) -> None:
+        """测试 batch 中抛出异常时已写入的值仍会通知"""
+        ref = Ref(0)
+        calls: list[int] = []
+        ref.subscribe(lambda new, old: calls.append(new))
+
+        with self.assertRaises(ValueError):
+            with batch():
+                ref.value = 1
+                raise ValueError("boom")
+
+        self.assertEqual(calls, [1])
+
+    def test_diamond_dependency_runs_once(self) -> None:
+        """测试菱形依赖(a -> b, a -> c, b + c -> d)中 d 只运行一次"""
+        a = Ref(1)
+        b = Ref(0)
+        c = Ref(0)
+        d_results: list[int] = []
+
+        @effect
+        def compute_b() -> None:
+            b.value = a.value * 2
+
+        @effect
+        def compute_c() -> None:
+            c.value = a.value * 3
+
+        @effect
+        def compute_d() -> None:
+            d_results.append(b.value + c.value)
+
+        compute_b()
+        compute_c()
+        compute_d()
+        self.assertEqual(d_results, [5])
+
+        a.value = 2
+        self.assertEqual(d_results, [5, 10])
+
+    def test_diamond_with_direct_and_indirect_dependency(self) -> None:
+        """测试 a -> b, effect(a, b) 的菱形中,effect 同时被 a 直接触发和经由 b 触发时只运行一次"""
+        a = Ref(1)
+        b = Ref(2)
+        runs: list[tuple[int, int]] = []
+
+        @effect
+        def read_both() -> None:
+            runs.append((a.value, b.value))
+
+        # effect 先于 b 的计算订阅 a,b 在下一轮才被通知
+        read_both()
+        a.subscribe(lambda new, old: setattr(b, 'value', new * 2))
+
+        a.value = 2
+        self.assertEqual(runs, [(1, 2), (2, 4)])
+
+    def test_writes_in_subscriber_are_flushed(self) -> None:
+        """测试订阅者在通知过程中的写入会在下一轮被通知"""
+        source = Ref(0)
+        derived = Ref(0)
+        calls: list[int] = []
+        source.subscribe(lambda new, old: setattr(derived, 'value', new + 1))
+        derived.subscribe(lambda new, old: calls.append(new))
+
+        source.value = 5
+        self.assertEqual(calls, [6])
+
+
+class TestBatchAsync(unittest.IsolatedAsyncioTestCase):
+    """batch 在异步环境下的测试"""
+
+    async def test_async_effect_writes_after_batch(self) -> None:
+        """测试 batch 调度的异步 effect 中的写入会正常通知"""
+        source = Ref(1)
+        target = Ref(0)
+        calls: list[int] = []
+        target.subscribe(lambda new, old: calls.append(new))
+
+        @effect
+        async def async_effect() -> None:
+            await asyncio.sleep(0.01)
+            target.value = source.value * 10
+
+        await async_effect()
+        self.assertEqual(calls, [10])
+
+        with batch():
+            source.value = 2
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(calls, [10, 20])
+
+
+if __name__ == '__main__':
+    unittest.main()
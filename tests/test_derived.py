@@ -0,0 +1,130 @@
+"""测试派生值的功能"""
+import unittest
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cognihub_pyeffectref import Ref, ReadOnlyRef, effect, batch, derived
+
+
+class TestDerived(unittest.TestCase):
+    """derived 的基本测试"""
+
+    def test_derived_initial_value(self) -> None:
+        """测试派生值创建时立即计算"""
+        a = Ref(2)
+        b = Ref(3)
+        product = derived(lambda: a.value * b.value)
+
+        self.assertIsInstance(product, ReadOnlyRef)
+        self.assertEqual(product.value, 6)
+
+    def test_derived_recomputes_on_change(self) -> None:
+        """测试依赖变化时重新计算"""
+        a = Ref(2)
+        b = Ref(3)
+        product = derived(lambda: a.value * b.value)
+
+        a.value = 4
+        self.assertEqual(product.value, 12)
+
+        with batch():
+            a.value = 1
+            b.value = 5
+        self.assertEqual(product.value, 5)
+
+    def test_unchanged_result_does_not_notify(self) -> None:
+        """测试重新计算的结果不变时不触发依赖它的 effect"""
+        number = Ref(2)
+        parity = derived(lambda: number.value % 2)
+        results = []
+
+        @effect
+        def show_parity() -> None:
+            results.append(parity.value)
+
+        show_parity()
+        number.value = 4  # 奇偶性不变
+        self.assertEqual(results, [0])
+
+        number.value = 5
+        self.assertEqual(results, [0, 1])
+
+    def test_effect_reading_source_and_derived_runs_once(self) -> None:
+        """测试同时读取源值和派生值的 effect 每次写入只运行一次,且不会看到中间状态"""
+        a = Ref(1)
+        b = derived(lambda: a.value * 2)
+        runs = []
+
+        @effect
+        def read_both() -> None:
+            runs.append((a.value, b.value))
+
+        read_both()
+        a.value = 2
+        self.assertEqual(runs, [(1, 2), (2, 4)])
+
+        a.value = 3
+        self.assertEqual(runs, [(1, 2), (2, 4), (3, 6)])
+
+    def test_effect_subscribed_before_chained_derived_runs_once(self) -> None:
+        """测试 effect 先于派生值订阅源值时,经过多级派生依然只运行一次"""
+        a = Ref(1)
+        runs = []
+        holder = []
+
+        @effect
+        def read_all() -> None:
+            runs.append((a.value, holder[0].value) if holder else (a.value, None))
+
+        read_all()
+        doubled = derived(lambda: a.value * 2)
+        quadrupled = derived(lambda: doubled.value * 2)
+        holder.append(quadrupled)
+        read_all()
+
+        a.value = 2
+        self.assertEqual(runs, [(1, None), (1, 4), (2, 8)])
+
+    def test_chained_derived(self) -> None:
+        """测试派生值依赖其他派生值"""
+        base = Ref(1)
+        doubled = derived(lambda: base.value * 2)
+        quadrupled = derived(lambda: doubled.value * 2)
+
+        base.value = 3
+        self.assertEqual(doubled.value, 6)
+        self.assertEqual(quadrupled.value, 12)
+
+    def test_recomputes_synchronously_with_executor(self) -> None:
+        """测试配置了同步任务执行器时,派生值仍在写入返回前完成重新计算"""
+        import concurrent.futures
+
+        original_config = Ref._global_sync_executor_config
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        Ref._global_sync_executor_config = executor
+        try:
+            a = Ref(1)
+            b = derived(lambda: a.value * 2)
+            c = derived(lambda: b.value + 1)
+
+            a.value = 2
+            self.assertEqual(b.value, 4)
+            self.assertEqual(c.value, 5)
+        finally:
+            Ref._global_sync_executor_config = original_config
+            executor.shutdown(wait=True)
+
+    def test_async_function_rejected(self) -> None:
+        """测试不支持协程函数"""
+        async def compute() -> int:
+            return 1
+
+        with self.assertRaises(TypeError):
+            derived(compute)
+
+
+if __name__ == '__main__':
+    unittest.main()
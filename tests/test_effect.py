@@ -63,6 +63,68 @@ class TestEffect(unittest.TestCase):
         counter.value = 2
         self.assertEqual(call_count, 2)
 
+    def test_effect_stop_unsubscribes_dependencies(self) -> None:
+        """测试 effect 停止后从所有依赖的 Ref 中移除"""
+        ref1 = Ref(1)
+        ref2 = Ref(2)
+        manual_ref = Ref(3)
+
+        @effect
+        def tracked_effect() -> None:
+            _ = ref1.value + ref2.value
+
+        tracked_effect()
+        manual_ref.subscribe(tracked_effect)
+        self.assertEqual(set(tracked_effect._deps), {ref1, ref2, manual_ref})
+
+        tracked_effect.stop()
+        self.assertNotIn(tracked_effect, ref1._subscribers)
+        self.assertNotIn(tracked_effect, ref2._subscribers)
+        self.assertNotIn(tracked_effect, manual_ref._subscribers)
+        self.assertEqual(len(tracked_effect._deps), 0)
+
+    def test_repeated_reads_subscribe_once(self) -> None:
+        """测试在一次执行中多次读取同一个 Ref 只登记一次依赖"""
+        ref = Ref(1)
+        call_count = 0
+
+        @effect
+        def loop_effect() -> None:
+            nonlocal call_count
+            call_count += 1
+            for _ in range(10):
+                _ = ref.value
+
+        loop_effect()
+        loop_effect()
+        self.assertEqual(list(ref._subscribers), [loop_effect])
+        self.assertEqual(len(loop_effect._deps), 1)
+
+        ref.value = 2
+        self.assertEqual(call_count, 3)
+
+    def test_triggered_run_collects_new_dependencies(self) -> None:
+        """测试由 Ref 变化触发的执行中第一次读取的 Ref 也会被收集为依赖"""
+        flag = Ref(False)
+        detail = Ref("a")
+        results = []
+
+        @effect
+        def conditional_effect() -> None:
+            if flag.value:
+                results.append(detail.value)
+            else:
+                results.append(None)
+
+        conditional_effect()
+        self.assertNotIn(conditional_effect, detail._subscribers)
+
+        flag.value = True
+        self.assertIn(conditional_effect, detail._subscribers)
+
+        detail.value = "b"
+        self.assertEqual(results, [None, "a", "b"])
+
     def test_multiple_refs_in_effect(self) -> None:
         """测试 effect 中使用多个 ref"""
         ref1 = Ref(1)
@@ -229,6 +291,97 @@ class TestEffectAsync(unittest.IsolatedAsyncioTestCase):
         ref.value = 1
         await asyncio.sleep(0.1)  # 等待异步执行
 
+    async def test_sync_effect_inside_async_effect(self) -> None:
+        """测试在异步 effect 中调用同步 effect 时,依赖归属于内层同步 effect"""
+        outer_ref = Ref(0)
+        inner_ref = Ref(0)
+        inner_calls = []
+
+        @effect
+        def inner_effect() -> None:
+            inner_calls.append(inner_ref.value)
+
+        @effect
+        async def outer_effect() -> None:
+            _ = outer_ref.value
+            inner_effect()
+            await asyncio.sleep(0.01)
+
+        await outer_effect()
+        self.assertIn(inner_effect, inner_ref._subscribers)
+        self.assertNotIn(outer_effect, inner_ref._subscribers)
+        self.assertIn(outer_effect, outer_ref._subscribers)
+
+        inner_ref.value = 1
+        self.assertEqual(inner_calls, [0, 1])
+
+    async def test_active_effect_count_restored(self) -> None:
+        """测试 effect 执行期间计数不为 0,执行结束(包括抛出异常)后恢复"""
+        from cognihub_pyeffectref import local
+
+        counts = []
+
+        @effect
+        def sync_effect() -> None:
+            counts.append(local._active_effect_count)
+
+        @effect
+        async def async_effect() -> None:
+            await asyncio.sleep(0.01)
+            counts.append(local._active_effect_count)
+
+        @effect
+        def failing_effect() -> None:
+            raise ValueError("boom")
+
+        before = local._active_effect_count
+        sync_effect()
+        await async_effect()
+        with self.assertRaises(ValueError):
+            failing_effect()
+
+        self.assertTrue(all(count > before for count in counts))
+        self.assertEqual(local._active_effect_count, before)
+
+    async def test_scheduled_subscriber_does_not_track_into_effect(self) -> None:
+        """测试 effect 中的写入调度的异步订阅者读取的 Ref 不会成为该 effect 的依赖"""
+        a = Ref(5)
+        b = Ref(0)
+        c = Ref(0)
+        runs = []
+
+        async def on_b(new: int, old: int) -> None:
+            _ = c.value
+
+        b.subscribe(on_b)
+
+        @effect
+        def copy_effect() -> None:
+            runs.append(a.value)
+            b.value = a.value
+
+        # 另一个异步 effect 保持运行,使依赖收集处于开启状态
+        release = asyncio.Event()
+
+        @effect
+        async def holder() -> None:
+            await release.wait()
+
+        holder_task = asyncio.ensure_future(holder())
+        await asyncio.sleep(0)
+
+        copy_effect()
+        await asyncio.sleep(0.01)
+        a.value = 1
+        await asyncio.sleep(0.01)
+        c.value = 1
+        await asyncio.sleep(0.01)
+
+        release.set()
+        await holder_task
+        self.assertEqual(runs, [5, 1])
+        self.assertNotIn(copy_effect, c._subscribers)
+
     async def test_mixed_sync_async_effects_interaction(self) -> None:
         """测试同步和异步 effect 的交互"""
         shared_ref = Ref(0)
@@ -4,7 +4,7 @@ import json
 import asyncio
 import sys
 import os
-from typing import Any
+from typing import Any, Dict
 
 # 添加项目根目录到 Python 路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -202,6 +202,80 @@ class TestReactiveDict(unittest.TestCase):
         with self.assertRaises(TypeError):
             rd.get_raw_ref("count.invalid")
 
+    def test_refs_created_lazily(self) -> None:
+        """测试 Ref 只在被响应式访问时才创建"""
+        rd: ReactiveDict = ReactiveDict({"name": "Alice", "age": 30, "tags": ["a"]})
+        self.assertEqual(rd._data_refs, {})
+
+        # effect 之外的读写不创建 Ref
+        self.assertEqual(rd.name, "Alice")
+        rd.age = 31
+        self.assertEqual(rd["age"], 31)
+        self.assertEqual(rd._data_refs, {})
+
+        names = []
+
+        @effect
+        def watch_name() -> None:
+            names.append(rd.name)
+
+        watch_name()
+        self.assertEqual(set(rd._data_refs), {"name"})
+
+        # 获取底层 Ref 时创建,且值为之前写入的值
+        age_ref = rd.get_raw_ref("age")
+        self.assertEqual(age_ref.value, 31)
+        self.assertIs(rd.get_raw_ref("age"), age_ref)
+
+        rd.name = "Bob"
+        self.assertEqual(names, ["Alice", "Bob"])
+
+    def test_repr(self) -> None:
+        """测试 __repr__ 方法"""
+        rd: ReactiveDict = ReactiveDict({"name": "Alice", "nested": {"age": 30}})
+        self.assertEqual(repr(rd), "ReactiveDict({'name': 'Alice', 'nested': ReactiveDict({'age': 30})})")
+
+    def test_slots_without_instance_dict(self) -> None:
+        """测试 ReactiveDict 使用 __slots__ 且支持弱引用"""
+        import weakref
+
+        rd: ReactiveDict = ReactiveDict({"name": "Alice"})
+        self.assertFalse(hasattr(rd, '__dict__'))
+        self.assertIs(weakref.ref(rd)(), rd)
+
+        # 非内部属性名仍然作为键保存
+        rd.extra = 1
+        self.assertEqual(rd["extra"], 1)
+
+    def test_compile_path(self) -> None:
+        """测试预编译路径的读取、设置、订阅和依赖收集"""
+        rd: ReactiveDict = ReactiveDict({"user": {"settings": {"theme": "dark"}}, "count": 1})
+        theme = rd.compile_path("user.settings.theme")
+
+        self.assertIs(theme.ref(), rd.get_raw_ref("user.settings.theme"))
+        self.assertEqual(theme.get(), "dark")
+
+        changes: list[str] = []
+        theme.subscribe(lambda new, old: changes.append(new))
+        theme.set("light")
+        self.assertEqual(rd.user.settings.theme, "light")
+        self.assertEqual(changes, ["light"])
+
+        results: list[str] = []
+
+        @effect
+        def show_theme() -> None:
+            results.append(theme.get())
+
+        show_theme()
+        rd.get_raw_ref("user.settings.theme").value = "blue"
+        self.assertEqual(results, ["light", "blue"])
+
+        with self.assertRaises(KeyError):
+            rd.compile_path("user.missing.theme").get()
+        with self.assertRaises(TypeError):
+            rd.compile_path("count.invalid").get()
+
     def test_attribute_error(self) -> None:
         """测试属性错误"""
         rd: ReactiveDict = ReactiveDict({"existing": "value"})
@@ -236,6 +310,25 @@ class TestReactiveDict(unittest.TestCase):
         self.assertEqual(call_count, 3)
         self.assertEqual(tracked_values[2], 10)
 
+    def test_equal_write_does_not_trigger_effect(self) -> None:
+        """测试写入相等的值时不触发 effect"""
+        rd: ReactiveDict = ReactiveDict({"counter": 0, "tags": ["a"]})
+        call_count = 0
+
+        @effect
+        def track() -> None:
+            nonlocal call_count
+            call_count += 1
+            _ = (rd.counter, rd.tags)
+
+        track()
+        rd.counter = 0
+        rd["tags"] = ["a"]  # 不同对象但值相等
+        self.assertEqual(call_count, 1)
+
+        rd.counter = 1
+        self.assertEqual(call_count, 2)
+
     def test_nested_reactive_with_effect(self) -> None:
         """测试嵌套响应式与 effect 的配合"""
         data = {"user": {"profile": {"score": 100}}}
@@ -323,6 +416,34 @@ class TestReactiveDict(unittest.TestCase):
         self.assertEqual(config_dict["port"], 3000)
         self.assertEqual(config_dict["ssl"], True)
 
+    def test_iteration_tracks_added_and_removed_keys(self) -> None:
+        """测试在 effect 中遍历时,增加或删除键会重新触发 effect"""
+        rd: ReactiveDict = ReactiveDict({"a": 1})
+        snapshots = []
+
+        @effect
+        def list_keys() -> None:
+            snapshots.append(sorted(rd))
+
+        list_keys()
+        rd["b"] = 2
+        del rd["a"]
+        rd["b"] = 3  # 已有键的修改不改变键集合
+        self.assertEqual(snapshots, [["a"], ["a", "b"], ["b"]])
+
+    def test_bulk_update_notifies_once(self) -> None:
+        """测试 bulk_update 写入多个键后 effect 只执行一次"""
+        rd: ReactiveDict = ReactiveDict({"a": 1, "b": 2})
+        totals = []
+
+        @effect
+        def total_effect() -> None:
+            totals.append(sum(rd.values()))
+
+        total_effect()
+        rd.bulk_update({"a": 10, "b": 20, "c": 30})
+        self.assertEqual(totals, [3, 60])
+
 
 class TestReactiveDictClassMethods(unittest.TestCase):
     """测试 ReactiveDict 的类方法"""
@@ -408,6 +529,20 @@ class TestReactiveDictAsync(unittest.IsolatedAsyncioTestCase):
 class TestReactiveDictIntegration(unittest.TestCase):
     """ReactiveDict 集成测试"""
 
+    perf_data: Dict[str, Any]
+    perf_rd: ReactiveDict
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # 性能测试用的较大嵌套结构只构建一次,只读测试共享同一个 ReactiveDict
+        cls.perf_data = {}
+        for i in range(100):
+            cls.perf_data[f"item_{i}"] = {
+                "id": i,
+                "data": {"value": i * 2, "active": i % 2 == 0}
+            }
+        cls.perf_rd = ReactiveDict(cls.perf_data)
+
     def test_complex_nested_operations(self) -> None:
         """测试复杂嵌套操作"""
         data = {
@@ -511,38 +646,51 @@ class TestReactiveDictIntegration(unittest.TestCase):
         self.assertEqual(settings_dict["theme"], "light")
 
     def test_reactive_dict_performance(self) -> None:
-        """简单性能测试"""
-        # 创建较大的嵌套结构
-        data = {}
-        for i in range(100):
-            data[f"item_{i}"] = {
-                "id": i,
-                "data": {"value": i * 2, "active": i % 2 == 0}
-            }
-        
-        rd: ReactiveDict = ReactiveDict(data)
-        
+        """简单性能测试:读取"""
+        rd = self.perf_rd
+
         # 测试访问性能
         total = 0
         for i in range(100):
             item_dict = rd[f"item_{i}"]
             data_dict = item_dict["data"]
             total += data_dict["value"]
-        
+
         expected_total = sum(i * 2 for i in range(100))
         self.assertEqual(total, expected_total)
-        
+
+    def test_reactive_dict_performance_mutation(self) -> None:
+        """简单性能测试:修改"""
+        # 修改会改变状态,使用独立的实例;ReactiveDict 不会修改传入的原始字典
+        rd: ReactiveDict = ReactiveDict(self.perf_data)
+
         # 测试修改性能
         for i in range(50):
             item_dict = rd[f"item_{i}"]
             data_dict = item_dict["data"]
             data_dict["value"] = i * 3
-        
+
         # 验证修改结果
         for i in range(50):
             item_dict = rd[f"item_{i}"]
             data_dict = item_dict["data"]
             self.assertEqual(data_dict["value"], i * 3)
+        self.assertEqual(self.perf_data["item_0"]["data"]["value"], 0)
+
+    def test_reactive_dict_performance_raw_refs(self) -> None:
+        """简单性能测试:缓存 get_raw_ref 取得的 Ref,直接读写叶子值"""
+        rd: ReactiveDict = ReactiveDict(self.perf_data)
+        refs = [rd.get_raw_ref(f"item_{i}.data.value") for i in range(100)]
+
+        total = sum(ref.value for ref in refs)
+        self.assertEqual(total, sum(i * 2 for i in range(100)))
+
+        for i, ref in enumerate(refs[:50]):
+            ref.value = i * 3
+
+        # 通过 Ref 的写入与逐级访问看到的是同一份数据
+        for i in range(50):
+            self.assertEqual(rd[f"item_{i}"]["data"]["value"], i * 3)
 
 
 if __name__ == '__main__':
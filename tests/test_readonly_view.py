@@ -1,5 +1,6 @@
 """ReadOnlyView的测试文件"""
 from cognihub_pyeffectref.effect import effect
+from cognihub_pyeffectref.batch import batch
 from cognihub_pyeffectref.ref import ReadOnlyRef
 from cognihub_pyeffectref.view import ReadOnlyView
 from cognihub_pyeffectref.reactive_dict import ReactiveDict
@@ -111,6 +112,28 @@ class TestReadOnlyView(unittest.TestCase):
         self.assertEqual(city_ref.value, 'Shanghai')
         self.assertEqual(score_ref.value, 95)
 
+    def test_child_views_are_cached(self) -> None:
+        """测试重复访问返回缓存的子视图,嵌套字典被替换后重新创建"""
+        self.assertIs(self.readonly_view.name, self.readonly_view.name)
+        nested_view = self.readonly_view.nested
+        self.assertIs(self.readonly_view.nested, nested_view)
+        self.assertIs(nested_view.city, nested_view.city)
+
+        # 替换嵌套的 ReactiveDict 后应返回新的视图
+        self.reactive_dict['nested'] = ReactiveDict({'city': 'Beijing', 'score': 80})  # type: ignore
+        new_nested_view = self.readonly_view.nested
+        self.assertIsNot(new_nested_view, nested_view)
+        self.assertEqual(new_nested_view.city.value, 'Beijing')
+
+    def test_views_share_child_views(self) -> None:
+        """测试同一个 ReactiveDict 的多个视图共享子视图,但私有属性互不影响"""
+        another_view = ReadOnlyView(cast(ReactiveDict, self.reactive_dict))
+        self.assertIs(another_view.nested, self.readonly_view.nested)  # type: ignore
+        self.assertIs(another_view.name, self.readonly_view.name)  # type: ignore
+
+        another_view._marker = 'another'
+        self.assertFalse(hasattr(self.readonly_view, '_marker'))
+
     def test_nonexistent_attribute_error(self) -> None:
         """测试访问不存在的属性"""
         with self.assertRaises(AttributeError) as cm:
@@ -291,6 +314,60 @@ class TestReadOnlyViewReactivity(unittest.TestCase):
         self.assertEqual(count_ref1.value, 100)
         self.assertEqual(count_ref2.value, 100)
 
+    def test_replace_nested_node_under_effect(self) -> None:
+        """测试在 effect 中通过视图读取时,整体替换嵌套节点会重新执行 effect"""
+        reactive_dict = ReactiveDict({'user': {'name': 'A'}})
+        view = ReadOnlyView(reactive_dict)
+        names = []
+
+        @effect
+        def watch_name() -> None:
+            names.append(view.user.name.value)
+
+        watch_name()
+        reactive_dict.user = ReactiveDict({'name': 'B'})
+
+        self.assertEqual(names, ['A', 'B'])
+
+    def test_raw_ref_write_dict_to_leaf(self) -> None:
+        """测试通过底层 Ref 把叶子节点改为 ReactiveDict 后,视图返回 ReadOnlyView"""
+        reactive_dict = ReactiveDict({'x': 1})
+        view = ReadOnlyView(reactive_dict)
+        self.assertIsInstance(view.x, ReadOnlyRef)
+
+        reactive_dict.get_raw_ref('x').value = ReactiveDict({'a': 1})
+
+        self.assertIsInstance(view.x, ReadOnlyView)
+        self.assertEqual(view.x.a.value, 1)
+
+    def test_raw_ref_write_scalar_to_nested(self) -> None:
+        """测试通过底层 Ref 把嵌套节点改为标量后,视图返回 ReadOnlyRef"""
+        reactive_dict = ReactiveDict({'cfg': {'a': 1}})
+        view = ReadOnlyView(reactive_dict)
+        self.assertIsInstance(view.cfg, ReadOnlyView)
+
+        reactive_dict.get_raw_ref('cfg').value = 5
+
+        self.assertIsInstance(view.cfg, ReadOnlyRef)
+        self.assertEqual(view.cfg.value, 5)
+
+    def test_batched_writes_through_multiple_views(self) -> None:
+        """测试批量修改多个字段时,通过不同视图读取的 effect 只执行一次"""
+        runs = []
+
+        @effect
+        def watch_both() -> None:
+            runs.append((self.view1.count.value, self.view2.nested.value.value))
+
+        watch_both()
+
+        with batch():
+            self.reactive_dict["count"] = 1
+            self.reactive_dict["nested"]["value"] = 11
+            self.reactive_dict["count"] = 2
+
+        self.assertEqual(runs, [(0, 10), (2, 11)])
+
 
 class TestReadOnlyViewComplexScenarios(unittest.TestCase):
     """测试ReadOnlyView的复杂场景"""
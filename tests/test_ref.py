@@ -129,6 +129,65 @@ class TestRef(unittest.TestCase):
         ref.value = 43
         self.assertEqual(call_count, 1)
 
+    def test_ref_same_object_skips_equality(self) -> None:
+        """测试重新赋值同一个对象时不调用 __eq__/__ne__"""
+        class Tracked:
+            compare_count = 0
+
+            def __eq__(self, other: object) -> bool:
+                Tracked.compare_count += 1
+                return self is other
+
+            def __ne__(self, other: object) -> bool:
+                return not self.__eq__(other)
+
+            __hash__ = object.__hash__
+
+        obj = Tracked()
+        ref = Ref(obj)
+        ref.value = obj
+        self.assertEqual(Tracked.compare_count, 0)
+
+        ref.value = Tracked()
+        self.assertEqual(Tracked.compare_count, 1)
+
+    def test_ref_custom_compare(self) -> None:
+        """测试自定义 compare 函数决定是否通知"""
+        ref = Ref([1, 2, 3], compare=lambda a, b: a is b)
+        calls = []
+        ref.subscribe(lambda new, old: calls.append(new))
+
+        # 内容相等但不是同一个对象,按引用比较视为改变
+        ref.value = [1, 2, 3]
+        self.assertEqual(len(calls), 1)
+
+        # 忽略大小写比较的字符串
+        name = Ref("Alice", compare=lambda a, b: a.lower() == b.lower())
+        name_calls = []
+        name.subscribe(lambda new, old: name_calls.append(new))
+        name.value = "ALICE"
+        self.assertEqual(name_calls, [])
+        self.assertEqual(name.value, "Alice")
+        name.value = "Bob"
+        self.assertEqual(name_calls, ["Bob"])
+
+    def test_ref_uncomparable_values_notify(self) -> None:
+        """测试比较时抛出异常的值被视为已改变"""
+        class Uncomparable:
+            def __ne__(self, other: object) -> bool:
+                raise ValueError("cannot compare")
+
+            __hash__ = object.__hash__
+
+        ref = Ref(Uncomparable())
+        calls = []
+        ref.subscribe(lambda new, old: calls.append(new))
+
+        new_value = Uncomparable()
+        ref.value = new_value
+        self.assertIs(ref.value, new_value)
+        self.assertEqual(calls, [new_value])
+
     def test_ref_repr(self) -> None:
         """测试 __repr__ 方法"""
         ref = Ref("test")
@@ -234,6 +293,59 @@ class TestRefAsync(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(len(async_calls), 2)
         self.assertEqual(async_calls[1], "changed")
 
+    async def test_async_callback_errors_report_own_name(self) -> None:
+        """测试异步回调的任务在完成前被保留,且异常信息对应各自的回调"""
+        import io
+        import contextlib
+        from cognihub_pyeffectref.ref import _background_tasks
+
+        ref = Ref(0)
+
+        async def first_failing(new: int, old: int) -> None:
+            await asyncio.sleep(0.01)
+            raise RuntimeError("first failed")
+
+        async def second_failing(new: int, old: int) -> None:
+            await asyncio.sleep(0.01)
+            raise RuntimeError("second failed")
+
+        ref.subscribe(first_failing)
+        ref.subscribe(second_failing)
+
+        f = io.StringIO()
+        with contextlib.redirect_stdout(f):
+            ref.value = 1
+            self.assertEqual(len(_background_tasks), 2)
+            await asyncio.sleep(0.05)
+
+        self.assertEqual(len(_background_tasks), 0)
+        output = f.getvalue()
+        self.assertIn("async callback first_failing: first failed", output)
+        self.assertIn("async callback second_failing: second failed", output)
+
+    async def test_scheduled_callback_starts_with_clean_context(self) -> None:
+        """测试在 effect 中调度的异步回调不继承调度方的当前 effect 和批量更新状态"""
+        from cognihub_pyeffectref import local
+
+        source = Ref(1)
+        target = Ref(0)
+        seen = []
+
+        async def on_target(new: int, old: int) -> None:
+            seen.append((local._current_effect.get(), local._batch_pending.get()))
+
+        target.subscribe(on_target)
+
+        @effect
+        def copy_effect() -> None:
+            target.value = source.value
+
+        # effect 首次执行时的写入在 effect 内部立即通知,回调任务在 effect 的上下文中被创建
+        copy_effect()
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(seen, [(None, None)])
+
 
 class TestReadOnlyRef(unittest.TestCase):
     """ReadOnlyRef 类的测试"""
@@ -917,6 +1029,21 @@ class TestRefValuePropertyBehavior(unittest.TestCase):
         ref.value = 43
         self.assertEqual(len(calls), 1)
 
+    def test_slots_without_instance_dict(self) -> None:
+        """测试 Ref 和 EffectWrapper 使用 __slots__ 且仍支持弱引用"""
+        import weakref
+        ref = Ref(0)
+
+        @effect
+        def slotted_effect() -> None:
+            _ = ref.value
+
+        self.assertFalse(hasattr(ref, '__dict__'))
+        self.assertFalse(hasattr(slotted_effect, '__dict__'))
+        self.assertIs(weakref.ref(ref)(), ref)
+        self.assertIs(weakref.ref(slotted_effect)(), slotted_effect)
+        self.assertEqual(slotted_effect.__name__, 'slotted_effect')
+
 
 class TestRefErrorHandling(unittest.TestCase):
     """测试 Ref 的错误处理"""
@@ -969,7 +1096,7 @@ class TestRefThreadSafetyAdvanced(unittest.TestCase):
             thread.join()
 
         # 测试应该完成而不崩溃
-        self.assertIsInstance(ref._subscribers, list)
+        self.assertIsInstance(ref._subscribers, dict)
 
     def test_concurrent_value_changes_and_subscriptions(self) -> None:
         """测试并发值变更和订阅操作"""
@@ -1120,6 +1247,21 @@ class TestReadOnlyRefAdvanced(unittest.TestCase):
         base_ref.value = 2
         self.assertEqual(len(calls), 1)  # 应该不再增加
 
+    def test_readonly_ref_unsubscribe_directly(self) -> None:
+        """测试直接通过 ReadOnlyRef 取消订阅"""
+        base_ref = Ref(0)
+        readonly_ref = ReadOnlyRef(base_ref)
+        calls = []
+
+        def callback(new_val: int, old_val: int) -> None:
+            calls.append(new_val)
+
+        readonly_ref.subscribe(callback)
+        base_ref.value = 1
+        readonly_ref.unsubscribe(callback)
+        base_ref.value = 2
+        self.assertEqual(calls, [1])
+
     def test_readonly_ref_thread_safety(self) -> None:
         """测试 ReadOnlyRef 的线程安全性"""
         base_ref = Ref(0)
@@ -1350,5 +1492,107 @@ class TestRefAsyncContextVarSupport(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(len(ref._subscribers), 0)
 
 
+class TestRefWeakSubscribe(unittest.TestCase):
+    """Ref 弱引用订阅测试"""
+
+    def test_weak_bound_method_removed_after_collection(self) -> None:
+        """测试实例被回收后弱引用订阅自动移除"""
+        import gc
+
+        calls = []
+
+        class Handler:
+            def on_change(self, new: int, old: int) -> None:
+                calls.append(new)
+
+        ref = Ref(0)
+        handler = Handler()
+        ref.subscribe(handler.on_change, weak=True)
+
+        ref.value = 1
+        self.assertEqual(calls, [1])
+        self.assertEqual(len(ref._subscribers), 1)
+
+        del handler
+        gc.collect()
+        self.assertEqual(len(ref._subscribers), 0)
+
+        ref.value = 2
+        self.assertEqual(calls, [1])
+
+    def test_weak_unsubscribe_with_original_callback(self) -> None:
+        """测试可以用原回调取消弱引用订阅"""
+        calls = []
+
+        def callback(new: int, old: int) -> None:
+            calls.append(new)
+
+        ref = Ref(0)
+        ref.subscribe(callback, weak=True)
+        ref.subscribe(callback, weak=True)  # 重复订阅被忽略
+        self.assertEqual(len(ref._subscribers), 1)
+
+        ref.unsubscribe(callback)
+        ref.value = 1
+        self.assertEqual(calls, [])
+
+    def test_weak_effect_rejected(self) -> None:
+        """测试 effect 不能弱引用订阅"""
+        ref = Ref(0)
+
+        @effect
+        def my_effect() -> None:
+            pass
+
+        with self.assertRaises(TypeError):
+            ref.subscribe(my_effect, weak=True)
+
+    def test_dead_weak_subscriber_pruned_later(self) -> None:
+        """测试回收时未能加锁而残留的弱引用订阅者会在之后的通知或订阅中被移除"""
+        import gc
+
+        calls = []
+
+        class Handler:
+            def on_change(self, new: int, old: int) -> None:
+                calls.append(new)
+
+        def hold_lock(lock: threading.Lock, held: threading.Event, release: threading.Event) -> None:
+            with lock:
+                held.set()
+                release.wait()
+
+        def drop_while_locked(ref: Ref[int], handlers: list[Handler]) -> None:
+            # 在另一个线程中持有订阅锁,使回收时的非阻塞加锁失败
+            held = threading.Event()
+            release = threading.Event()
+            holder = threading.Thread(target=hold_lock, args=(ref._subscribers_lock, held, release))
+            holder.start()
+            held.wait()
+            handlers.clear()
+            gc.collect()
+            release.set()
+            holder.join()
+
+        # 通知时移除
+        ref = Ref(0)
+        handlers = [Handler()]
+        ref.subscribe(handlers[0].on_change, weak=True)
+        drop_while_locked(ref, handlers)
+        self.assertEqual(len(ref._subscribers), 1)
+        ref.value = 1
+        self.assertEqual(len(ref._subscribers), 0)
+        self.assertEqual(calls, [])
+
+        # 订阅其他回调时移除
+        other = Ref(0)
+        handlers = [Handler()]
+        other.subscribe(handlers[0].on_change, weak=True)
+        drop_while_locked(other, handlers)
+        self.assertEqual(len(other._subscribers), 1)
+        other.subscribe(lambda new, old: None)
+        self.assertEqual(len(other._subscribers), 1)
+
+
 if __name__ == '__main__':
     unittest.main()